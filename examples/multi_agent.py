@@ -0,0 +1,85 @@
+import random
+import sys
+from time import perf_counter
+
+from think import (Agent, Clock, Environment, GreenletClock, Motor, Task,
+                   Vision, World)
+
+
+class TeamTask(Task):
+    '''Shows a target on a display shared by a team of agents.
+
+    Each agent types its own response key, and the task listens for each
+    key separately, so a response only reaches the handler for its agent.
+    '''
+
+    def __init__(self, env, n_agents):
+        super().__init__()
+        self.display = env.display
+        self.keyboard = env.keyboard
+        self.responses = [0] * n_agents
+
+    def run(self, time):
+        for i, key in enumerate(TeamAgent.KEYS[:len(self.responses)]):
+            def handle_key(key, i=i):
+                self.responses[i] += 1
+            self.keyboard.add_type_fn(handle_key, key)
+
+        # the last target comes at the end time, for agents still waiting
+        while self.time() <= time:
+            self.display.clear()
+            self.display.add_text(random.randint(0, 500),
+                                  random.randint(0, 500), 'X', isa='target')
+            self.wait(1.0)
+
+
+class TeamAgent(Agent):
+    KEYS = [chr(c) for c in range(ord('a'), ord('z') + 1)]
+
+    def __init__(self, env, index, clock=None):
+        super().__init__(name='agent{}'.format(index), clock=clock)
+        self.key = TeamAgent.KEYS[index % len(TeamAgent.KEYS)]
+        self.vision = Vision(self, env.display)
+        self.motor = Motor(self, self.vision, env)
+
+    def run(self, time):
+        while self.time() < time:
+            visual = self.vision.wait_for(isa='target')
+            self.vision.encode(visual)
+            self.motor.type(self.key)
+
+
+def run_team(n_agents, time=20, clock_class=Clock):
+    # all agents share one clock; a GreenletClock switches between agents
+    # without waking OS threads, which keeps large teams fast
+    env = Environment()
+    clock = clock_class(output=False)
+    task = TeamTask(env, min(n_agents, len(TeamAgent.KEYS)))
+    agents = [TeamAgent(env, i, clock) for i in range(n_agents)]
+    World(task, *agents).run(time)
+    return task
+
+
+def benchmark(counts=(1, 10, 50, 100, 200, 500), time=20, clock_class=Clock):
+    # simulated seconds per wall-clock second as the team grows
+    rates = []
+    for n in counts:
+        start = perf_counter()
+        run_team(n, time, clock_class)
+        elapsed = perf_counter() - start
+        rates.append((n, time / elapsed))
+        print('{:4d} agents: {:8.1f} sim-s/wall-s, {:8.1f} agent-sim-s/wall-s'
+              .format(n, time / elapsed, n * time / elapsed))
+    return rates
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or (1, 10, 50, 100, 200, 500)
+    print('Clock')
+    benchmark(counts)
+    try:
+        import greenlet
+        print('GreenletClock')
+        benchmark(counts, clock_class=GreenletClock)
+    except ImportError:
+        pass
@@ -1,6 +1,7 @@
 import random
 
-from think import Agent, Data, Environment, Memory, Motor, Task, Vision, World
+from think import (Agent, Data, Environment, Memory, Motor, Task, Vision,
+                   World, set_params)
 
 
 class PairedAssociatesTask(Task):
@@ -72,27 +73,40 @@ class PairedAssociatesAgent(Agent):
             self.memory.store(word=word, digit=digit)
 
 
+def run_paired_associates(params=None):
+    env = Environment()
+    task = PairedAssociatesTask(env)
+    agent = PairedAssociatesAgent(env, output=False)
+    set_params(agent, params or {})
+    World(task, agent).run(1590)
+    return task.corrects, task.rts
+
+
 class PairedAssociatesSimulation():
     HUMAN_CORRECT = [.000, .526, .667, .798, .887, .924, .958, .954]
     HUMAN_RT = [.000, 2.158, 1.967, 1.762, 1.680, 1.552, 1.467, 1.402]
 
-    def __init__(self, n_sims=10):
+    def __init__(self, n_sims=10, workers=None, half_width=None):
         self.n_sims = n_sims
+        self.workers = workers
+        self.half_width = half_width
+        self.runs = 0
 
     def run(self, output=False):
-        corrects = Data(PairedAssociatesTask.N_BLOCKS)
-        rts = Data(PairedAssociatesTask.N_BLOCKS)
-
-        for _ in range(self.n_sims):
-            env = Environment()
-            task = PairedAssociatesTask(env, corrects=corrects, rts=rts)
-            agent = PairedAssociatesAgent(env, output=False)
-            World(task, agent).run(1590)
+        if self.half_width is None:
+            corrects, rts = World.run_many(run_paired_associates, self.n_sims,
+                                           workers=self.workers)
+            self.runs = self.n_sims
+        else:
+            (corrects, rts), self.runs = World.run_until_precise(
+                run_paired_associates, self.half_width, max_n=self.n_sims,
+                workers=self.workers)
 
         result_correct = corrects.analyze(self.HUMAN_CORRECT)
         result_rt = rts.analyze(self.HUMAN_RT)
 
         if output:
+            print('\nRuns: {}'.format(self.runs))
             result_correct.output("Correctness", 2)
             result_rt.output("Response Times", 2)
 
@@ -0,0 +1,12 @@
+import unittest
+
+from examples.multi_agent import run_team
+
+
+class MultiAgentTest(unittest.TestCase):
+
+    def test_multi_agent(self, output=False):
+        task = run_team(30, 10)
+        self.assertEqual(26, len(task.responses))
+        self.assertEqual(11 * 2, task.responses[0])
+        self.assertEqual(11, task.responses[-1])
@@ -1,7 +1,10 @@
-from .core import (Agent, Area, Buffer, Cancel, Clock, Data, Display,
-                   Environment, Item, Keyboard, Location, Module, Mouse,
-                   Process, Query, Result, SlotQuery, Speakers, Task, Values,
-                   Worker, World, get_think_logger)
+from .core import (Agent, Area, Buffer, Cancel, Clock, ClockStats, Data,
+                   Display, Environment, Fit, GreenletClock, Item, Keyboard,
+                   Location, Module, Mouse, Process, Query, Result,
+                   ResultStore, SlotQuery, Speakers, Sweep, Task,
+                   TraceRecorder, Values, Worker, World, code_version,
+                   get_think_logger, grid, read_trace, set_params,
+                   trace_to_text)
 from .modules import (Audition, Aural, Chunk, Dwell, Eyes, EyeTracker,
                       Fixation, Gaze, Instruction, Language, Memory, Motor,
                       Speech, Vision, Visual)
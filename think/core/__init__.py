@@ -1,9 +1,13 @@
 from .agent import Agent, Buffer, Module, Worker
 from .analysis import Data, Result, Values
-from .clock import Clock
+from .clock import Clock, ClockStats, GreenletClock
 from .env import Display, Environment, Keyboard, Mouse, Speakers
+from .fit import Fit
 from .item import Area, Item, Location, Query, SlotQuery
 from .logger import get_think_logger
 from .process import Cancel, Process
+from .store import ResultStore
+from .sweep import Sweep, code_version, grid, set_params
+from .trace import TraceRecorder, read_trace, trace_to_text
 from .window import DisplayWindow
 from .world import Task, World
@@ -1,7 +1,6 @@
-import threading
-
 from .clock import Clock
 from .process import Process
+from .trace import _snapshot
 
 _DEBUG = False
 
@@ -11,7 +10,7 @@ class Agent(Process):
     def __init__(self, name='agent', clock=None, output=False):
         super().__init__(name, clock or Clock(output=output))
         self.think_time = .050
-        self.clock.register(threading.current_thread())
+        self.clock.register(self.clock.current_thread())
         self.think_worker = Worker('think', self)
         self.modules = {}
 
@@ -27,10 +26,10 @@ class Agent(Process):
     def module(self, name):
         return self.modules[name]
 
-    def think(self, message):
+    def think(self, message, *args):
         self.think_worker.acquire()
         self.clock.report_think()
-        self.log(message)
+        self.log_format(message, *args)
         self.wait_until(self.time() + self.think_time)
         self.think_worker.release()
         self.report_event()
@@ -40,15 +39,28 @@ class Agent(Process):
 class Module(Process):
 
     def __init__(self, name, agent):
-        super().__init__(name, agent.clock)
         self.agent = agent
+        super().__init__(name, agent.clock)
         agent.add_module(self)
 
-    def think(self, message):
-        self.agent.think(message)
+    # modules always use their agent's clock, so a World that moves the
+    # agent onto a shared clock moves its modules too
+    @property
+    def clock(self):
+        return self.agent.clock
+
+    @clock.setter
+    def clock(self, clock):
+        self.agent.clock = clock
+
+    def think(self, message, *args):
+        self.agent.think(message, *args)
 
-    def log(self, message):
-        super().log(message, self.agent.name + '.' + self.name)
+    def log(self, message, *args):
+        if self.clock.sink is not None:
+            self.clock.log(message, self.agent.name + '.' + self.name, args)
+
+    log_format = log
 
     def debug(self, message):
         super().debug(message, self.agent.name + '.' + self.name)
@@ -59,38 +71,47 @@ class Worker:
     def __init__(self, name, process):
         self.name = name
         self.process = process
-        self.lock = threading.Lock()
+        self.owner = None
+        self.waiters = []
+        self.watchers = []
+
+    def __str__(self):
+        agent = getattr(self.process, 'agent', self.process)
+        return '{}.{}'.format(agent.name, self.name)
 
     def acquire(self):
-        locked = self.lock.acquire(False)
-        while not locked:
-            if _DEBUG:
-                self.process.debug(
-                    'worker "{}" acquire failed'.format(self.name))
-            self.process.wait_for_next_event()
-            locked = self.lock.acquire(False)
+        self.process.clock.acquire(self)
         if _DEBUG:
             self.process.debug('worker "{}" acquired'.format(self.name))
 
-    def run(self, delay=0.0, message=None, action=None, release=True):
+    def _actions(self, message, action, release, args):
+        # a delayed message shows its arguments as they are now
+        if args and self.process.clock.sink is not None:
+            args = _snapshot(args)
+
         def _actions():
             if message is not None:
-                self.process.log(message)
+                self.process.log_format(message, *args)
             if action is not None:
                 action()
             if release:
                 self.release()
-        self.process.run_thread(_actions, delay)
+        return _actions
+
+    def run(self, delay=0.0, message=None, action=None, release=True, args=()):
+        self.process.run_thread(
+            self._actions(message, action, release, args), delay)
+
+    def schedule(self, delay=0.0, message=None, action=None, release=True,
+                 args=()):
+        self.process.schedule(
+            self._actions(message, action, release, args), delay)
 
     def wait_until_free(self):
-        locked = self.lock.acquire(False)
-        while not locked:
-            self.process.wait_for_next_event()
-            locked = self.lock.acquire(False)
-        self.lock.release()
+        self.process.clock.wait_until_free(self)
 
     def release(self):
-        self.lock.release()
+        self.process.clock.release(self)
         self.process.report_event()
         self.process.wait_for_next_event()
         if _DEBUG:
@@ -110,7 +131,10 @@ class Buffer(Worker):
         if _DEBUG:
             self.process.debug('buffer "{}" acquired'.format(self.name))
 
-    def set(self, contents, delay=None, message=None, action=None):
+    def set(self, contents, delay=None, message=None, action=None, args=(),
+            thread=False):
+        # with thread, the delayed action runs in a thread of its own, so
+        # it can wait; otherwise it runs as a scheduled call
         if delay is None:
             self.contents = contents
             self.content_worker.release()
@@ -120,10 +144,13 @@ class Buffer(Worker):
                 self.content_worker.release()
                 if action is not None:
                     action()
-            self.content_worker.run(delay, message, _action, False)
+            run = (self.content_worker.run if thread
+                   else self.content_worker.schedule)
+            run(delay, message, _action, False, args)
 
-    def clear(self, delay=None, message=None, action=None):
-        self.set(None, delay, message, action)
+    def clear(self, delay=None, message=None, action=None, args=(),
+              thread=False):
+        self.set(None, delay, message, action, args, thread)
 
     def wait_for_content(self):
         if _DEBUG:
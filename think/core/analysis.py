@@ -10,6 +10,10 @@ class Values:
         self.v.append(d)
         return self
 
+    def extend(self, values):
+        self.v.extend(values.v)
+        return self
+
     def keep(self, start=0, step=1):
         v2 = []
         for i in range(start, len(self.v), step):
@@ -98,7 +102,8 @@ class Values:
             return None
 
     def ci(self):
-        return 1.96 * self.se()
+        se = self.se()
+        return 1.96 * se if se is not None else None
 
     def percent_over(self, threshold):
         if self.v:
@@ -140,6 +145,11 @@ class Data:
     def add(self, i, d):
         self.values_list[i].add(d)
 
+    def extend(self, data):
+        for values, other in zip(self.values_list, data.values_list):
+            values.extend(other)
+        return self
+
     def means(self):
         res = Values()
         for values in self.values_list:
@@ -1,3 +1,7 @@
+import asyncio
+import collections
+import heapq
+import itertools
 import logging
 import threading
 import time
@@ -5,6 +9,9 @@ import time
 from .logger import get_think_logger
 
 _DEBUG = False
+_STALL_LIMIT = 100000
+_IDLE_LIMIT = 64
+_HANDOFF = float('-inf')
 
 
 try:
@@ -28,48 +35,260 @@ class _ThreadInfo:
     EVENT_WAIT = 3
     NEXT = 4
     DONE = 5
+    ALL_WAIT = 6
+    CANCELED = 7
+    QUEUED = 8
 
-    def __init__(self, index):
+    def __init__(self, index, parent):
         self.index = index
-        self.parent = threading.current_thread()
+        self.parent = parent
         self.status = _ThreadInfo.RUNNING
         self.requested_time = None
         self.last_think_time = -.001
+        self.ticket = None
+        self.wakeup = None
+        self.reason = None
 
-    status_labels = {1: 'running', 2: 'timed_wait',
-                     3: 'event_wait', 4: 'next', 5: 'done'}
+    status_labels = {1: 'running', 2: 'timed_wait', 3: 'event_wait',
+                     4: 'next', 5: 'done', 6: 'all_wait', 7: 'canceled',
+                     8: 'queued'}
 
     def __str__(self):
         return '{}: {} [{}, {}]'.format(self.index, _ThreadInfo.status_labels[self.status],
                                         self.requested_time, self.last_think_time)
 
 
+class _Call:
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.ticket = None
+
+
+class _Aborted(Exception):
+    pass
+
+
+class _Canceled(_Aborted):
+    pass
+
+
+class _PooledThread(threading.Thread):
+
+    def __init__(self, pool, name):
+        super().__init__(name=name, daemon=True)
+        self.pool = pool
+        self.target = None
+        self.ready = threading.Lock()
+        self.ready.acquire()
+
+    def give(self, target):
+        self.target = target
+        self.ready.release()
+
+    def run(self):
+        while True:
+            self.ready.acquire()
+            target, self.target = self.target, None
+            try:
+                target()
+            except _Aborted:
+                pass
+            if not self.pool.park(self):
+                return
+
+
+class _ThreadPool:
+
+    def __init__(self, limit=_IDLE_LIMIT):
+        self.idle = []
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.count = itertools.count(1)
+
+    def take(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        return _PooledThread(self, 'think-{}'.format(next(self.count)))
+
+    def park(self, thread):
+        # threads beyond the limit exit, so a burst of concurrent threads
+        # does not stay parked for the life of the process
+        with self.lock:
+            if len(self.idle) >= self.limit:
+                return False
+            self.idle.append(thread)
+            return True
+
+
+_thread_pool = _ThreadPool()
+
+
+class _Message:
+
+    def __init__(self, message, args):
+        self.message = message
+        self.args = args
+
+    def __str__(self):
+        return self.message.format(*self.args)
+
+
+class _LoggerSink:
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def event(self, time, source, message, args):
+        self.logger.info(_Message(message, args) if args else message,
+                         extra={'time': time, 'source': source})
+
+
+class ClockStats:
+
+    def __init__(self, clock, callback=None, interval=1.0):
+        self.clock = clock
+        self.callback = callback
+        self.interval = interval
+        self.cycles = 0
+        self.registered = 0
+        self.deregistered = 0
+        self.canceled = 0
+        self.wakeups = 0
+        self.idle_wakeups = 0
+        self.fast_forwards = 0
+        self.update_time = 0.0
+        self.start_wall = time.perf_counter()
+        self.start_time = clock._time
+        self.last_callback = self.start_wall
+
+    def add_cycle(self, start, end):
+        self.cycles += 1
+        self.update_time += end - start
+        # runs on the scheduling thread, so callbacks must not block
+        if self.callback is not None and end - self.last_callback >= self.interval:
+            self.last_callback = end
+            self.callback(self.snapshot())
+
+    def add_wakeup(self, running):
+        self.wakeups += 1
+        if not running:
+            self.idle_wakeups += 1
+
+    def snapshot(self):
+        wall_time = time.perf_counter() - self.start_wall
+        sim_time = self.clock._time - self.start_time
+        return {'cycles': self.cycles,
+                'registered': self.registered,
+                'deregistered': self.deregistered,
+                'canceled': self.canceled,
+                'live_threads': len(self.clock.threads),
+                'wakeups': self.wakeups,
+                'idle_wakeups': self.idle_wakeups,
+                'fast_forwards': self.fast_forwards,
+                'update_time': self.update_time,
+                'wall_time': wall_time,
+                'sim_time': sim_time,
+                'wall_per_sim': wall_time / sim_time if sim_time > 0 else None}
+
+
 class Clock:
 
-    def __init__(self, real_time=False, output=True):
+    def __init__(self, real_time=False, output=True, speed=1.0, catch_up=True):
         self._time = 0.0
         self.time_lock = threading.Lock()
         self.real_time = real_time
+        self.speed = speed
+        self.catch_up = catch_up
+        self._wall_origin = None
+        self._sim_origin = None
+        self._lag = 0.0
         self.threads = {}
         self.threads_lock = threading.Lock()
+        self._n_running = 0
+        self._timed = []
+        self._calls = []
+        self._due_calls = []
+        self._n_calls = 0
+        self._callback_thread = None
+        self._next = []
+        self._event_waiters = []
+        self._dones = set()
+        self._all_waiter = None
+        self._seq = itertools.count()
         self.event_flag = False
-        self.barrier = threading.Barrier(0, lambda: self.update_all())
-        self.barrier_lock = threading.Lock()
+        self._stats = None
+        self._owners = {}
+        self._error = None
+        self.stall_limit = _STALL_LIMIT
+        self._stall_time = None
+        self._stall_cycles = 0
         self.set_output(output)
 
+    def enable_stats(self, callback=None, interval=1.0):
+        self._stats = ClockStats(self, callback, interval)
+        return self._stats
+
+    def disable_stats(self):
+        self._stats = None
+
+    def stats(self):
+        return self._stats.snapshot() if self._stats is not None else None
+
     def set_output(self, output):
+        if hasattr(output, 'event'):
+            self.logger = None
+            self.sink = output
+            return
         if isinstance(output, logging.Logger):
             self.logger = output
         elif output:
             self.logger = get_think_logger()
         else:
             self.logger = None
+        self.sink = _LoggerSink(self.logger) if self.logger else None
+
+    def set_real_time(self, real_time, speed=None, catch_up=None):
+        self.real_time = real_time
+        if speed is not None:
+            self.speed = speed
+        if catch_up is not None:
+            self.catch_up = catch_up
+        self._wall_origin = None
+        self._lag = 0.0
+
+    def lag(self):
+        return self._lag
+
+    def _sleep(self, sec):
+        sleep(sec)
+
+    def _pace(self, old_time, new_time):
+        # sleeps toward a schedule anchored at the first paced step, so the
+        # overhead of each step is absorbed rather than accumulated
+        now = time.monotonic()
+        if self._wall_origin is None:
+            self._wall_origin = now
+            self._sim_origin = old_time
+        target = self._wall_origin + (new_time - self._sim_origin) / self.speed
+        if target > now:
+            self._sleep(target - now)
+            if self.catch_up:
+                self._lag = 0.0
+        elif self.catch_up:
+            self._lag = now - target
+        else:
+            self._lag += now - target
+            self._wall_origin = now
+            self._sim_origin = new_time
 
     def advance(self, dt):
         with self.time_lock:
+            old_time = self._time
             self._time += dt
-            if self.real_time:
-                sleep(dt)
+            if self.real_time and dt > 0:
+                self._pace(old_time, self._time)
 
     def time(self):
         with self.time_lock:
@@ -80,20 +299,37 @@ class Clock:
             old_time = self._time
             self._time = t
             if self.real_time and old_time < t:
-                sleep(t - old_time)
+                self._pace(old_time, t)
+
+    def current_thread(self):
+        return threading.current_thread()
+
+    def start_thread(self, target):
+        thread = _thread_pool.take()
+        self.register(thread)
+        if not thread.is_alive():
+            thread.start()
+        thread.give(target)
+        return thread
+
+    def _new_info_locked(self, thread):
+        info = _ThreadInfo(len(self.threads) + 1, self.current_thread())
+        info.wakeup = threading.Lock()
+        info.wakeup.acquire()
+        return info
 
     def register(self, thread):
-        n_threads = 0
         with self.threads_lock:
-            self.threads[thread] = _ThreadInfo(len(self.threads) + 1)
+            old = self.threads.get(thread)
+            if old is None or old.status in (_ThreadInfo.DONE,
+                                             _ThreadInfo.CANCELED):
+                self._n_running += 1
+            self.threads[thread] = self._new_info_locked(thread)
+            if self._stats is not None:
+                self._stats.registered += 1
             if _DEBUG:
-                self.debug('register thread: ' + thread.name)
-            n_threads = len(self.threads)
-        with self.barrier_lock:
-            self.barrier._parties = n_threads  # self.barrier._parties + 1
-            if _DEBUG:
-                self.debug('({} threads in barrier)'.format(
-                    self.barrier.parties))
+                self.debug('register thread: {} ({} threads)'.format(
+                    thread, len(self.threads)))
 
     def n_threads(self):
         with self.threads_lock:
@@ -101,7 +337,7 @@ class Clock:
 
     def n_children(self, parent=None):
         if parent is None:
-            parent = threading.current_thread()
+            parent = self.current_thread()
         with self.threads_lock:
             count = 0
             for info in self.threads.values():
@@ -111,19 +347,56 @@ class Clock:
 
     def thread_index(self, thread=None):
         if thread is None:
-            thread = threading.current_thread()
+            thread = self.current_thread()
         with self.threads_lock:
             return self.threads[thread].index
 
     def deregister(self):
+        thread = self.current_thread()
+        with self.threads_lock:
+            self.threads[thread].status = _ThreadInfo.DONE
+            self._dones.add(thread)
+            if self._stats is not None:
+                self._stats.deregistered += 1
+            self._suspend_locked()
+
+    def call_at(self, time, fn):
+        # runs fn at the given time from within the scheduler, without a
+        # thread of its own; fn must not wait, but it can start a thread
+        # (start_thread) for work that does
+        call = _Call(fn)
         with self.threads_lock:
-            self.threads[threading.current_thread()].status = _ThreadInfo.DONE
-        self.barrier.wait()
+            call.ticket = next(self._seq)
+            heapq.heappush(self._calls, (time, call.ticket, call))
+            self._n_calls += 1
+        return call
+
+    def cancel(self, thread):
+        # only a thread still waiting out its delay can be unscheduled;
+        # it is woken just to exit, without running or being counted
+        with self.threads_lock:
+            if isinstance(thread, _Call):
+                if thread.ticket is None:
+                    return False
+                thread.ticket = None
+                self._n_calls -= 1
+                if self._stats is not None:
+                    self._stats.canceled += 1
+                return True
+            info = self.threads.get(thread)
+            if info is None or info.status != _ThreadInfo.TIMED_WAIT:
+                return False
+            info.status = _ThreadInfo.CANCELED
+            info.ticket = None
+            self._dones.add(thread)
+            if self._stats is not None:
+                self._stats.canceled += 1
+            self._resume_locked(thread, info)
+            return True
 
     def report_think(self):
         with self.threads_lock:
-            self.threads[threading.current_thread(
-            )].last_think_time = self.time()
+            self.threads[self.current_thread()].last_think_time = self.time()
         if _DEBUG:
             self.debug('reported think')
 
@@ -132,119 +405,324 @@ class Clock:
         if _DEBUG:
             self.debug('reported event')
 
-    def wait_for_next_event(self):
+    def acquire(self, worker):
+        self._queue(worker, True)
+
+    def wait_until_free(self, worker):
+        self._queue(worker, False)
+
+    def _queue(self, worker, acquire):
+        thread = self.current_thread()
+        with self.threads_lock:
+            if worker.owner is None:
+                if acquire:
+                    worker.owner = thread
+                    self._owners[worker] = thread
+                return
+            self._check_can_wait_locked(thread)
+            info = self.threads[thread]
+            info.status = _ThreadInfo.QUEUED
+            info.reason = worker
+            if acquire:
+                # contenders are served in the order event waiters are
+                # (least recent thinker first), then in order of arrival
+                heapq.heappush(worker.waiters, (info.last_think_time,
+                                                next(self._seq), thread))
+            else:
+                worker.watchers.append(thread)
+            self._suspend_locked()
+        self._wait_my_turn(info)
+
+    def release(self, worker):
+        # hands the worker straight to the next acquirer, so only it and
+        # the threads waiting for the worker to be free are woken
+        with self.threads_lock:
+            worker.owner = None
+            self._owners.pop(worker, None)
+            for thread in worker.watchers:
+                self._hand_off_locked(thread)
+            worker.watchers = []
+            if worker.waiters:
+                _, _, thread = heapq.heappop(worker.waiters)
+                worker.owner = thread
+                self._owners[worker] = thread
+                self._hand_off_locked(thread)
+
+    def _hand_off_locked(self, thread):
+        info = self.threads[thread]
+        info.status = _ThreadInfo.NEXT
+        self._push_locked(self._next, _HANDOFF, thread, info)
+
+    def wait_for_next_event(self, reason=None):
+        thread = self.current_thread()
+        if thread is self._callback_thread:
+            return
         with self.threads_lock:
-            info = self.threads[threading.current_thread()]
+            info = self.threads[thread]
             info.status = _ThreadInfo.EVENT_WAIT
-        self._wait_my_turn()
+            info.reason = reason
+            self._event_waiters.append(thread)
+            self._suspend_locked()
+        self._wait_my_turn(info)
 
     def wait_until(self, time):
+        thread = self.current_thread()
         with self.threads_lock:
-            info = self.threads[threading.current_thread()]
+            self._check_can_wait_locked(thread)
+            if self._can_fast_forward_locked(time):
+                self.set(time)
+                if self._stats is not None:
+                    self._stats.fast_forwards += 1
+                return
+            info = self.threads[thread]
             info.status = _ThreadInfo.TIMED_WAIT
             info.requested_time = time
-        self._wait_my_turn()
+            self._push_locked(self._timed, time, thread, info)
+            self._suspend_locked()
+        self._wait_my_turn(info)
 
-    def _wait_my_turn(self):
-        if _DEBUG:
-            self.debug('waiting at barrier...')
-        self.barrier.wait()
-        while not self._is_running(threading.current_thread()):
-            self.barrier.wait()
-
-    def _is_running(self, thread):
+    def wait_for_all(self):
+        thread = self.current_thread()
         with self.threads_lock:
-            return self.threads[thread].status == _ThreadInfo.RUNNING
+            self._check_can_wait_locked(thread)
+            info = self.threads[thread]
+            info.status = _ThreadInfo.ALL_WAIT
+            self._all_waiter = thread
+            self._suspend_locked()
+        self._wait_my_turn(info)
+
+    def _can_fast_forward_locked(self, time):
+        # when the caller is the only running thread and nothing else is
+        # due before its deadline, the next cycle would just wake it again
+        if self._n_running != 1 or self.event_flag:
+            return False
+        if self._peek_locked(self._next) is not None:
+            return False
+        next_time = self._next_time_locked()
+        return next_time is None or time < next_time
+
+    def _check_can_wait_locked(self, thread):
+        if thread is self._callback_thread:
+            raise Exception('cannot wait inside a scheduled call; '
+                            'use run_thread for work that waits')
+
+    def _suspend_locked(self):
+        # the last thread to stop running schedules the next ones
+        self._n_running -= 1
+        if self._n_running == 0:
+            self._cycle_locked()
+
+    def _cycle_locked(self):
+        while True:
+            if self._stats is None:
+                self._update_locked()
+            else:
+                start = time.perf_counter()
+                self._update_locked()
+                self._stats.add_cycle(start, time.perf_counter())
+            if not self._due_calls:
+                return
+            self._run_calls_locked()
+            if self._n_running != 0 or self._error is not None:
+                return
+
+    def _run_calls_locked(self):
+        # due calls run on the scheduling thread outside the lock, counted
+        # as one running thread so that no cycle starts underneath them
+        # and a call that fails aborts the simulation, so the error reaches
+        # every waiting thread rather than just the one scheduling
+        calls, self._due_calls = self._due_calls, []
+        self._n_running += 1
+        self._callback_thread = self.current_thread()
+        self.threads_lock.release()
+        error = None
+        try:
+            for call in calls:
+                call.fn()
+        except Exception as e:
+            error = e
+        finally:
+            self.threads_lock.acquire()
+            self._callback_thread = None
+            self._n_running -= 1
+        if error is not None:
+            self._abort_locked('failed in a scheduled call: {!r}'.format(
+                error))
+
+    def _wait_my_turn(self, info):
+        if _DEBUG:
+            self.debug('waiting for turn...')
+        info.wakeup.acquire()
+        if info.status == _ThreadInfo.CANCELED:
+            raise _Canceled()
+        if self._error is not None:
+            raise _Aborted(self._error)
+        if self._stats is not None:
+            self._stats.add_wakeup(info.status == _ThreadInfo.RUNNING)
+
+    def _wake_locked(self, thread):
+        info = self.threads[thread]
+        info.status = _ThreadInfo.RUNNING
+        info.ticket = None
+        self._n_running += 1
+        self._resume_locked(thread, info)
+
+    def _resume_locked(self, thread, info):
+        info.wakeup.release()
+
+    def _abort_locked(self, problem):
+        # every waiting thread wakes up and raises the report
+        self._error = self._report_locked(problem)
+        for thread, info in self.threads.items():
+            if info.status not in (_ThreadInfo.RUNNING, _ThreadInfo.DONE,
+                                   _ThreadInfo.CANCELED):
+                self._resume_locked(thread, info)
+
+    def _report_locked(self, problem):
+        lines = ['simulation {} at time {:.3f}'.format(problem, self._time)]
+        held = {}
+        for resource, thread in self._owners.items():
+            held.setdefault(thread, []).append(str(resource))
+        for thread, info in self.threads.items():
+            line = '  thread {} ({})'.format(
+                info.index, _ThreadInfo.status_labels[info.status])
+            if info.status == _ThreadInfo.TIMED_WAIT:
+                line += ' until {:.3f}'.format(info.requested_time)
+            elif (info.status in (_ThreadInfo.EVENT_WAIT, _ThreadInfo.NEXT,
+                                  _ThreadInfo.QUEUED)
+                  and info.reason is not None):
+                line += ' waiting for {}'.format(info.reason)
+            if thread in held:
+                line += ', holding {}'.format(', '.join(held[thread]))
+            lines.append(line)
+        return '\n'.join(lines)
 
     def _debug_threads(self):
         for thread, info in self.threads.items():
-            self.debug('[{}] -> {}'.format(thread.name, info))
+            self.debug('[{}] -> {}'.format(thread, info))
 
     def update_all(self):
         with self.threads_lock:
+            self._cycle_locked()
+
+    def _update_locked(self):
+        if _DEBUG:
+            self.debug('updating: event_flag = {}'.format(self.event_flag))
+            self.debug('-----')
+            self._debug_threads()
+
+        # a set, since a pooled thread can be reused and finish again
+        # before the cycle that removes it
+        for thread in self._dones:
+            info = self.threads.get(thread)
+            if info is None or info.status not in (_ThreadInfo.DONE,
+                                                   _ThreadInfo.CANCELED):
+                continue
+            del self.threads[thread]
             if _DEBUG:
-                self.debug('updating: event_flag = {}'.format(self.event_flag))
-                self.debug('-----')
-                self._debug_threads()
-
-            dones = []
-            for thread, info in self.threads.items():
-                if info.status == _ThreadInfo.DONE:
-                    dones.append(thread)
-            for thread in dones:
-                del self.threads[thread]
-                if _DEBUG:
-                    self.debug('deleting thread [{}]'.format(thread.name))
-                with self.barrier_lock:
-                    self.barrier._parties = self.barrier._parties - 1
-
-            if (self.event_flag):
-                self.event_flag = False
-                self._change_status_locked(
-                    _ThreadInfo.EVENT_WAIT, _ThreadInfo.NEXT)
-            count = self._run_next_threads_locked()
-            if count == 0:
-                self._run_timed_threads_locked()
-            if _DEBUG:
-                self.debug('--> [t={}]'.format(self.time()))
-                self._debug_threads()
-                self.debug('-----')
+                self.debug('deleting thread [{}]'.format(thread))
+        self._dones = set()
 
-    def _change_status_locked(self, old, new):
-        count = 0
-        for info in self.threads.values():
-            if info.status == old:
-                info.status = new
-                count += 1
-        return count
+        if self._time != self._stall_time:
+            self._stall_time = self._time
+            self._stall_cycles = 0
+        else:
+            self._stall_cycles += 1
+            if self._stall_cycles > self.stall_limit:
+                self._abort_locked('stalled for {} cycles'.format(
+                    self._stall_cycles))
+                return
+
+        if (self.event_flag):
+            self.event_flag = False
+            self._make_next_locked()
+        count = self._run_next_threads_locked()
+        if count == 0:
+            self._run_timed_threads_locked()
+        if (self._all_waiter is not None and len(self.threads) <= 1
+                and self._n_calls == 0):
+            self._wake_locked(self._all_waiter)
+            self._all_waiter = None
+        if self._n_running == 0 and not self._due_calls and self.threads:
+            self._abort_locked('deadlocked')
+            return
+        if _DEBUG:
+            self.debug('--> [t={}]'.format(self.time()))
+            self._debug_threads()
+            self.debug('-----')
+
+    def _make_next_locked(self):
+        for thread in self._event_waiters:
+            info = self.threads[thread]
+            if info.status == _ThreadInfo.EVENT_WAIT:
+                info.status = _ThreadInfo.NEXT
+                self._push_locked(self._next, info.last_think_time,
+                                  thread, info)
+        self._event_waiters = []
+
+    def _push_locked(self, heap, key, thread, info):
+        info.ticket = next(self._seq)
+        heapq.heappush(heap, (key, info.ticket, thread))
+
+    def _peek_locked(self, heap):
+        # entries whose thread has since been rescheduled or removed are
+        # stale, and are dropped as they reach the top of the heap
+        while heap:
+            key, ticket, thread = heap[0]
+            info = self.threads.get(thread)
+            if info is not None and info.ticket == ticket:
+                return key
+            heapq.heappop(heap)
+        return None
 
     def _run_next_threads_locked(self):
-        min_time = None
-        for info in self.threads.values():
-            if info.status == _ThreadInfo.NEXT:
-                time = info.last_think_time
-                if min_time is None or time < min_time:
-                    min_time = time
-        if min_time is not None:
-            count = 0
-            for info in self.threads.values():
-                if info.status == _ThreadInfo.NEXT and info.last_think_time <= min_time:
-                    info.status = _ThreadInfo.RUNNING
-                    count += 1
-            return count
-        else:
+        min_time = self._peek_locked(self._next)
+        if min_time is None:
             return 0
+        count = 0
+        while self._peek_locked(self._next) is not None and self._next[0][0] <= min_time:
+            _, _, thread = heapq.heappop(self._next)
+            self._wake_locked(thread)
+            count += 1
+        return count
+
+    def _peek_calls_locked(self):
+        while self._calls:
+            key, ticket, call = self._calls[0]
+            if call.ticket == ticket:
+                return key
+            heapq.heappop(self._calls)
+        return None
+
+    def _next_time_locked(self):
+        timed_time = self._peek_locked(self._timed)
+        call_time = self._peek_calls_locked()
+        if call_time is None or (timed_time is not None
+                                 and timed_time < call_time):
+            return timed_time
+        return call_time
 
     def _run_timed_threads_locked(self):
-        min_time = None
-        for info in self.threads.values():
-            if info.status == _ThreadInfo.TIMED_WAIT:
-                time = info.requested_time
-                if min_time is None or time < min_time:
-                    min_time = time
-        if min_time is not None:
-            count = 0
-            for info in self.threads.values():
-                if info.status == _ThreadInfo.TIMED_WAIT and info.requested_time <= min_time:
-                    info.status = _ThreadInfo.RUNNING
-                    info.requested_time = None
-                    count += 1
-            self.set(min_time)
-            return count
-        else:
+        min_time = self._next_time_locked()
+        if min_time is None:
             return 0
+        count = 0
+        while self._peek_locked(self._timed) is not None and self._timed[0][0] <= min_time:
+            _, _, thread = heapq.heappop(self._timed)
+            self.threads[thread].requested_time = None
+            self._wake_locked(thread)
+            count += 1
+        while self._peek_calls_locked() is not None and self._calls[0][0] <= min_time:
+            _, _, call = heapq.heappop(self._calls)
+            call.ticket = None
+            self._n_calls -= 1
+            self._due_calls.append(call)
+        self.set(min_time)
+        return count
 
-    def wait_for_all(self):
-        self.barrier.wait()
-        while len(self.threads) > 1:
-            if _DEBUG:
-                self.debug('waiting for all...')
-            self.barrier.wait()
-
-    def log(self, message, source='clock'):
-        if self.logger:
-            self.logger.info(
-                message, extra={'time': self.time(), 'source': source})
+    def log(self, message, source='clock', args=()):
+        if self.sink is not None:
+            self.sink.event(self.time(), source, message, args)
 
     def debug(self, message, source='clock'):
         if _DEBUG and self.logger:
@@ -252,3 +730,100 @@ class Clock:
                 threading.current_thread().name, message)
             self.logger.debug(
                 message, extra={'time': self.time(), 'source': source})
+
+
+try:
+
+    import greenlet
+
+    class GreenletClock(Clock):
+
+        def __init__(self, real_time=False, output=True, speed=1.0, catch_up=True):
+            super().__init__(real_time, output, speed, catch_up)
+            self._hub = None
+            self._ready = collections.deque()
+            self._driver = None
+            self._cycled = False
+            self._pending_sleep = 0.0
+
+        def current_thread(self):
+            return greenlet.getcurrent()
+
+        def _get_hub(self):
+            if self._hub is None or self._hub.dead:
+                self._hub = greenlet.greenlet(self._run_hub)
+            return self._hub
+
+        def _run_hub(self):
+            while self._ready and self._error is None:
+                if self._driver is not None and self._cycled:
+                    self._cycled = False
+                    delay, self._pending_sleep = self._pending_sleep, 0.0
+                    self._driver.switch(delay)
+                self._ready.popleft().switch()
+            with self.threads_lock:
+                error = self._error or self._report_locked('deadlocked')
+            raise _Aborted(error)
+
+        def start_thread(self, target):
+            thread = greenlet.greenlet(target, parent=self._get_hub())
+            self.register(thread)
+            self._ready.append(thread)
+            return thread
+
+        def _new_info_locked(self, thread):
+            return _ThreadInfo(len(self.threads) + 1, self.current_thread())
+
+        def _resume_locked(self, thread, info):
+            self._ready.append(thread)
+
+        def _abort_locked(self, problem):
+            # the hub raises the report once the current thread switches back
+            self._error = self._report_locked(problem)
+
+        def _wait_my_turn(self, info):
+            self._get_hub().switch()
+            if info.status == _ThreadInfo.CANCELED:
+                raise greenlet.GreenletExit()
+            if self._stats is not None:
+                self._stats.add_wakeup(info.status == _ThreadInfo.RUNNING)
+
+        def _can_fast_forward_locked(self, time):
+            # a driven clock must come back to the event loop every cycle
+            return (self._driver is None
+                    and super()._can_fast_forward_locked(time))
+
+        def _sleep(self, sec):
+            if self._driver is not None:
+                self._pending_sleep = max(self._pending_sleep, sec)
+            else:
+                sleep(sec)
+
+        def _update_locked(self):
+            super()._update_locked()
+            self._cycled = True
+
+        def _adopt(self, old, new):
+            with self.threads_lock:
+                self.threads[new] = self.threads.pop(old)
+
+        async def run_async(self, fn):
+            outer = self.current_thread()
+            inner = greenlet.greenlet(fn)
+            self._adopt(outer, inner)
+            self._driver = outer
+            try:
+                delay = inner.switch()
+                while not inner.dead:
+                    await asyncio.sleep(delay or 0)
+                    delay = self._get_hub().switch()
+            finally:
+                self._driver = None
+                self._adopt(inner, outer)
+
+except ImportError as e:
+
+    class GreenletClock:
+
+        def __init__(self, real_time=False, output=True, speed=1.0, catch_up=True):
+            raise Exception('greenlet must be installed to use GreenletClock')
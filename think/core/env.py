@@ -6,6 +6,7 @@ from .window import DisplayWindow
 
 
 class DisplayVisual(Area):
+    __slots__ = ('freq', 'obj')
 
     def __init__(self, x, y, w, h, isa, obj):
         super().__init__(x, y, w, h, isa)
@@ -18,13 +19,26 @@ class Display:
 
     def __init__(self, viewing_distance=30, pixels_per_inch=72, window=None):
         self.vision = None
+        self.visions = []
+        self.waiters = {}
         self.visuals = []
         self.viewing_distance = viewing_distance
         self.pixels_per_inch = pixels_per_inch
         self.window = DisplayWindow(self, size=window) if window else None
 
     def set_vision(self, vision):
+        # several agents' visions can share a display; only those waiting
+        # for a visual (see add_waiter) are checked when one is added
         self.vision = vision
+        self.visions.append(vision)
+        return self
+
+    def add_waiter(self, vision):
+        self.waiters[vision] = True
+        return self
+
+    def remove_waiter(self, vision):
+        self.waiters.pop(vision, None)
         return self
 
     def _draw_if_window(self):
@@ -43,7 +57,8 @@ class Display:
     def add(self, x, y, w, h, isa, obj):
         visual = DisplayVisual(x, y, w, h, isa, obj)
         self.visuals.append(visual)
-        self.vision.check_wait_for(visual)
+        for vision in list(self.waiters):
+            vision.check_wait_for(visual)
         self._draw_if_window()
         return visual
 
@@ -149,6 +164,7 @@ class Keyboard:
             self._char_to_shifted[t[0]] = t[1]
             self._code_to_char[t[2]] = t[0]
         self.type_fns = []
+        self.key_fns = {}
 
     def code(self, c):
         return self._char_to_code[c]
@@ -159,13 +175,26 @@ class Keyboard:
     def char(self, code):
         return self._code_to_char[code]
 
-    def add_type_fn(self, fn):
-        self.type_fns.append(fn)
+    def add_type_fn(self, fn, key=None):
+        # with a key, fn is only called when that key is typed, so typing
+        # does not call every agent's or task's handler
+        if key is None:
+            self.type_fns.append(fn)
+        else:
+            self.key_fns.setdefault(key, []).append(fn)
+        return self
+
+    def remove_type_fn(self, fn, key=None):
+        fns = self.type_fns if key is None else self.key_fns.get(key, [])
+        if fn in fns:
+            fns.remove(fn)
         return self
 
     def type(self, key):
         for fn in self.type_fns:
             fn(key)
+        for fn in self.key_fns.get(key, ()):
+            fn(key)
         return self
 
 
@@ -176,15 +205,30 @@ class Mouse:
         self.visual = None
         self.move_fns = []
         self.click_fns = []
+        self.visual_click_fns = {}
 
     def add_move_fn(self, fn):
         self.move_fns.append(fn)
         return self
 
-    def add_click_fn(self, fn):
-        self.click_fns.append(fn)
+    def add_click_fn(self, fn, visual=None):
+        # with a visual, fn is only called for clicks on that visual
+        if visual is None:
+            self.click_fns.append(fn)
+        else:
+            self.visual_click_fns.setdefault(visual, []).append(fn)
+        return self
+
+    def remove_click_fn(self, fn, visual=None):
+        fns = (self.click_fns if visual is None
+               else self.visual_click_fns.get(visual, []))
+        if fn in fns:
+            fns.remove(fn)
         return self
 
+    def has_click_fns(self, visual):
+        return bool(self.click_fns or self.visual_click_fns.get(visual))
+
     def move(self, visual):
         self.visual = visual
         for fn in self.move_fns:
@@ -195,6 +239,8 @@ class Mouse:
         self.visual = visual
         for fn in self.click_fns:
             fn(self.visual)
+        for fn in self.visual_click_fns.get(visual, ()):
+            fn(self.visual)
         return self
 
 
@@ -0,0 +1,197 @@
+import functools
+import os
+
+from .analysis import Data, Result
+from .world import _merge, _pool, _run_jobs, _seeds
+
+
+class _Candidate:
+
+    def __init__(self, x, params):
+        self.x = x
+        self.params = params
+        self.results = []
+        self.score = None
+
+    def n(self):
+        return len(self.results)
+
+
+class Fit:
+    '''Fits model parameters by minimizing a Result metric.
+
+    The factory is a top-level callable taking a dict of parameters (see
+    set_params) and returning Data, or a tuple or list of Data, matching
+    the human data. The space maps each parameter to its (low, high)
+    bounds. Every candidate uses the same replication seeds (common random
+    numbers), candidates in a batch run together across the workers, and
+    replications are added in stages, dropping candidates whose score is
+    worse than the best fully run candidate by more than the margin.
+    '''
+
+    def __init__(self, factory, human, space, metric='nrmse',
+                 method='nelder-mead', n=10, n_min=None, margin=.1, seed=0,
+                 workers=None, max_evals=100, tolerance=1e-3, start=None):
+        if method not in ('nelder-mead', 'coordinate'):
+            raise Exception('unknown fit method: {}'.format(method))
+        self.factory = factory
+        self.human = human
+        self.names = list(space)
+        self.bounds = [space[name] for name in self.names]
+        self.metric = metric
+        self.method = method
+        self.n = n
+        self.n_min = min(n_min or max(n // 4, 1), n)
+        self.margin = margin
+        self.seeds = _seeds(n, seed)
+        self.workers = workers
+        self.max_evals = max_evals
+        self.tolerance = tolerance
+        self.start = start
+        self.candidates = {}
+        self.best = None
+        self._pool = None
+
+    def params(self, x):
+        return {name: low + xi * (high - low)
+                for name, (low, high), xi in zip(self.names, self.bounds, x)}
+
+    def score(self, result):
+        if callable(self.metric):
+            return self.metric(result)
+        if isinstance(result, (tuple, list)):
+            pairs = zip(result, self.human)
+        else:
+            pairs = [(result, self.human)]
+        total = 0.0
+        for model, human in pairs:
+            if isinstance(model, Data):
+                model = model.means()
+            value = getattr(Result(model, human), self.metric)
+            if value is None:
+                return float('inf')
+            total += 1 - value if self.metric == 'r' else value
+        return total
+
+    def _clip(self, x):
+        return [round(min(max(xi, 0.0), 1.0), 12) for xi in x]
+
+    def _candidate(self, x):
+        x = tuple(self._clip(x))
+        candidate = self.candidates.get(x)
+        if candidate is None:
+            candidate = _Candidate(x, self.params(x))
+            self.candidates[x] = candidate
+        return candidate
+
+    def _stages(self):
+        stage = self.n_min
+        while stage < self.n:
+            yield stage
+            stage *= 2
+        yield self.n
+
+    def evaluate(self, xs):
+        candidates = [self._candidate(x) for x in xs]
+        alive = [c for c in candidates if c.n() < self.n]
+        for stage in self._stages():
+            todo = [c for c in alive if c.n() < stage]
+            jobs = []
+            for c in todo:
+                factory = functools.partial(self.factory, c.params)
+                jobs.extend((factory, seed)
+                            for seed in self.seeds[c.n():stage])
+            results = iter(_run_jobs(jobs, self.workers, pool=self._pool))
+            for c in todo:
+                count = stage - c.n()
+                c.results.extend(next(results) for _ in range(count))
+                c.score = self.score(_merge(c.results))
+                if c.n() == self.n and (self.best is None
+                                        or c.score < self.best.score):
+                    self.best = c
+            if self.best is not None:
+                limit = self.best.score + self.margin * abs(self.best.score)
+                alive = [c for c in alive if c.score <= limit]
+        return [c.score for c in candidates]
+
+    def n_evals(self):
+        return len(self.candidates)
+
+    def run(self):
+        # one pool of worker processes serves every stage of every step
+        if (self.workers or os.cpu_count() or 1) <= 1:
+            return self._run()
+        with _pool(self.workers) as self._pool:
+            try:
+                return self._run()
+            finally:
+                self._pool = None
+
+    def _run(self):
+        if self.start is not None:
+            x0 = [(self.start[name] - low) / (high - low)
+                  for name, (low, high) in zip(self.names, self.bounds)]
+        else:
+            x0 = [.5] * len(self.names)
+        if self.method == 'nelder-mead':
+            self._nelder_mead(x0)
+        else:
+            self._coordinate(x0)
+        return self.best.params, self.best.score
+
+    def _coordinate(self, x):
+        step = .25
+        score, = self.evaluate([x])
+        while step >= self.tolerance and self.n_evals() < self.max_evals:
+            xs = []
+            for i in range(len(x)):
+                for d in (-step, step):
+                    xs.append(self._clip(x[:i] + [x[i] + d] + x[i + 1:]))
+            scores = self.evaluate(xs)
+            best = min(range(len(xs)), key=lambda i: scores[i])
+            if scores[best] < score:
+                x, score = xs[best], scores[best]
+            else:
+                step /= 2
+
+    def _nelder_mead(self, x0):
+        # the reflection, expansion and both contractions of each step are
+        # evaluated as one batch, so they can run in parallel
+        d = len(x0)
+        simplex = [list(x0)]
+        for i in range(d):
+            x = list(x0)
+            x[i] = x[i] + .25 if x[i] + .25 <= 1 else x[i] - .25
+            simplex.append(x)
+        scores = self.evaluate(simplex)
+        while self.n_evals() < self.max_evals:
+            order = sorted(range(d + 1), key=lambda i: scores[i])
+            simplex = [simplex[i] for i in order]
+            scores = [scores[i] for i in order]
+            size = max(abs(a - b) for x in simplex[1:]
+                       for a, b in zip(x, simplex[0]))
+            if size < self.tolerance:
+                break
+            centroid = [sum(x[i] for x in simplex[:-1]) / d
+                        for i in range(d)]
+            worst = simplex[-1]
+
+            def point(t):
+                return [c + t * (c - w) for c, w in zip(centroid, worst)]
+            xs = [self._clip(point(t)) for t in (1, 2, .5, -.5)]
+            fr, fe, fo, fi = self.evaluate(xs)
+            if fr < scores[0]:
+                new = (xs[1], fe) if fe < fr else (xs[0], fr)
+            elif fr < scores[-2]:
+                new = (xs[0], fr)
+            elif fr < scores[-1]:
+                new = (xs[2], fo) if fo <= fr else None
+            else:
+                new = (xs[3], fi) if fi < scores[-1] else None
+            if new is not None:
+                simplex[-1], scores[-1] = new
+            else:
+                best = simplex[0]
+                simplex = [best] + [[b + .5 * (x - b) for b, x in zip(best, s)]
+                                    for s in simplex[1:]]
+                scores = [scores[0]] + self.evaluate(simplex[1:])
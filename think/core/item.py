@@ -1,76 +1,134 @@
 import math
+import operator
+import types
+
+
+_interned = {}
+_layouts = {}
+
+
+def _is_attribute(cls, slot):
+    # names in a subclass's __slots__ are data descriptors, so the instance
+    # dict does not hide them
+    return hasattr(cls, slot) and not isinstance(
+        getattr(cls, slot), types.MemberDescriptorType)
+
+
+def _layout(cls, slots):
+    # items with the same slot names share one interned tuple of names;
+    # also returns the slots named like an attribute of the class, such as
+    # a method, whose values would hide it if kept in the instance dict
+    key = (cls, slots)
+    entry = _layouts.get(key)
+    if entry is None:
+        layout = _interned.setdefault(slots, slots)
+        hidden = frozenset(slot for slot in slots if _is_attribute(cls, slot))
+        entry = _layouts[key] = (layout, hidden)
+    return entry
 
 
 class Item:
+    # slot values live in the instance dict, so reading one as an
+    # attribute is a plain attribute lookup; _layout names which entries
+    # of the dict are slots, as opposed to other attributes, and slots
+    # named like an attribute of the class are kept in _hidden instead
+    __slots__ = ('_layout', '_hidden', '__dict__', '__weakref__')
 
     def __init__(self, **slotvals):
-        self.slots = slotvals
+        self._layout, hidden = _layout(type(self), tuple(slotvals))
+        if hidden:
+            self._hidden = {slot: slotvals.pop(slot) for slot in hidden}
+        self.__dict__.update(slotvals)
+
+    @property
+    def slots(self):
+        # a new dict each time; slots are changed through set and unset
+        values = self.__dict__
+        if hasattr(self, '_hidden'):
+            values = dict(values, **self._hidden)
+        return {slot: values[slot] for slot in self._layout}
 
     def get_slots(self):
-        return self.slots.keys()
+        return self._layout
 
     def get(self, slot):
-        return self.slots[slot] if slot in self.slots else None
-
-    def __getattr__(self, slot):
-        if slot in super().__getattribute__('slots'):
-            return self.get(slot)
-        else:
-            return super().__getattribute__(slot)
+        if slot in self._layout:
+            try:
+                return self.__dict__[slot]
+            except KeyError:
+                return self._hidden[slot]
+        return None
 
     def has(self, slot):
-        return slot in self.slots
+        return slot in self._layout
 
     def set(self, slot, val):
-        self.slots[slot] = val
-        return self
-
-    def __setattr__(self, slot, val):
-        if 'slots' in self.__dict__ and slot in self.slots:
-            self.set(slot, val)
+        values = self.__dict__
+        if slot in self._layout:
+            if slot not in values:
+                self._hidden[slot] = val
+                return self
         else:
-            super().__setattr__(slot, val)
+            self._layout, hidden = _layout(type(self),
+                                           self._layout + (slot,))
+            if slot in hidden:
+                if not hasattr(self, '_hidden'):
+                    self._hidden = {}
+                self._hidden[slot] = val
+                return self
+        values[slot] = val
+        return self
 
     def unset(self, slot):
-        self.slots.pop(slot, None)
+        if slot in self._layout:
+            self._layout, _ = _layout(type(self),
+                                      tuple(s for s in self._layout
+                                            if s != slot))
+            if slot in self.__dict__:
+                del self.__dict__[slot]
+            else:
+                del self._hidden[slot]
         return self
 
     def equals(self, item):
-        return len(self.slots) == len(item.slots) and self.matches(item)
+        return len(self._layout) == len(item._layout) and self.matches(item)
 
     def matches(self, item):
-        for slot, val in item.slots.items():
-            if slot not in self.slots or self.slots[slot] != val:
-                return False
+        values = self.__dict__
+        layout = self._layout
+        other = item.__dict__
+        try:
+            for slot in item._layout:
+                if slot not in layout or values[slot] != other[slot]:
+                    return False
+        except KeyError:
+            # a hidden slot
+            return all(slot in layout and self.get(slot) == item.get(slot)
+                       for slot in item._layout)
         return True
 
     def __str__(self):
         return '{}'.format(self.slots)
 
 
+def _never(val, target):
+    return False
+
+
+_OPS = {'=': operator.eq, '!=': operator.ne, '>': operator.gt,
+        '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+
 class SlotQuery:
 
     def __init__(self, slot, op, val):
         self.slot = slot
         self.op = op
         self.val = val
+        self.fn = _OPS.get(op, _never)
 
     def matches(self, item):
-        val = item.get(self.slot)
-        if self.op == '=':
-            return val == self.val
-        elif self.op == '!=':
-            return val != self.val
-        elif self.op == '>':
-            return val > self.val
-        elif self.op == '>=':
-            return val >= self.val
-        elif self.op == '<':
-            return val < self.val
-        elif self.op == '<=':
-            return val <= self.val
-        else:
-            return False
+        return self.fn(item.get(self.slot), self.val)
 
     def __str__(self):
         return '{}{}{}'.format(self.slot, self.op, self.val)
@@ -80,32 +138,32 @@ class Query:
 
     def __init__(self, **slotvals):
         self.slotqs = []
+        self._compiled = None
         for slot, val in slotvals.items():
             self.eq(slot, val)
 
-    def eq(self, slot, val):
-        self.slotqs.append(SlotQuery(slot, '=', val))
+    def _add(self, slot, op, val):
+        self.slotqs.append(SlotQuery(slot, op, val))
+        self._compiled = None
         return self
 
+    def eq(self, slot, val):
+        return self._add(slot, '=', val)
+
     def ne(self, slot, val):
-        self.slotqs.append(SlotQuery(slot, '!=', val))
-        return self
+        return self._add(slot, '!=', val)
 
     def gt(self, slot, val):
-        self.slotqs.append(SlotQuery(slot, '>', val))
-        return self
+        return self._add(slot, '>', val)
 
     def ge(self, slot, val):
-        self.slotqs.append(SlotQuery(slot, '>=', val))
-        return self
+        return self._add(slot, '>=', val)
 
     def lt(self, slot, val):
-        self.slotqs.append(SlotQuery(slot, '<', val))
-        return self
+        return self._add(slot, '<', val)
 
     def le(self, slot, val):
-        self.slotqs.append(SlotQuery(slot, '<=', val))
-        return self
+        return self._add(slot, '<=', val)
 
     def get(self, slot, op=None, val=None):
         for slotq in self.slotqs:
@@ -117,17 +175,67 @@ class Query:
     def has(self, slot, op=None, val=None):
         return self.get(slot, op, val) is not None
 
+    def compile(self):
+        '''Returns a function that tests whether an item matches.
+
+        The equality tests are checked first, as one comparison of a tuple
+        of the item's values; the function is cached until the query is
+        changed.
+        '''
+        if self._compiled is None:
+            self._compiled = self._compile()
+        return self._compiled
+
+    def _compile(self):
+        eq_slots = tuple(q.slot for q in self.slotqs if q.op == '=')
+        eq_vals = tuple(q.val for q in self.slotqs if q.op == '=')
+        others = tuple((q.slot, q.fn, q.val) for q in self.slotqs
+                       if q.op != '=')
+        if len(eq_slots) == 1:
+            key = eq_vals[0]
+        else:
+            key = eq_vals
+        getter = operator.itemgetter(*eq_slots) if eq_slots else None
+        # whether each item layout has every equality slot, so its values
+        # can be taken straight from the item's dict
+        complete = {}
+
+        def matches(item):
+            if getter is not None:
+                layout = item._layout
+                full = complete.get(layout)
+                if full is None:
+                    full = all(slot in layout for slot in eq_slots)
+                    complete[layout] = full
+                if full:
+                    try:
+                        if getter(item.__dict__) != key:
+                            return False
+                    except KeyError:
+                        # a hidden slot
+                        full = False
+                if not full and (tuple(item.get(slot) for slot in eq_slots)
+                                 != eq_vals):
+                    return False
+            for slot, fn, val in others:
+                if not fn(item.get(slot), val):
+                    return False
+            return True
+        return matches
+
     def matches(self, item):
-        for slotq in self.slotqs:
-            if not slotq.matches(item):
-                return False
-        return True
+        return self.compile()(item)
+
+    def filter(self, items):
+        matches = self.compile()
+        return [item for item in items if matches(item)]
 
     def __str__(self):
         return '[' + ', '.join(map(str, self.slotqs)) + ']'
 
 
 class Location(Item):
+    __slots__ = ()
 
     def __init__(self, x, y, isa='location'):
         super().__init__(isa=isa, x=x, y=y)
@@ -154,6 +262,7 @@ class Location(Item):
 
 
 class Area(Location):
+    __slots__ = ('x1', 'x2', 'y1', 'y2')
 
     def __init__(self, x, y, w, h, isa='area'):
         super().__init__(x, y, isa)
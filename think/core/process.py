@@ -8,9 +8,11 @@ class Cancel:
     HAS_RUN = 2
     CANCELED = 3
 
-    def __init__(self):
+    def __init__(self, clock=None, thread=None):
         self.status = Cancel.WILL_RUN
         self.lock = threading.Lock()
+        self.clock = clock
+        self.thread = thread
 
     def try_run(self):
         with self.lock:
@@ -22,11 +24,12 @@ class Cancel:
 
     def try_cancel(self):
         with self.lock:
-            if self.status == Cancel.WILL_RUN:
-                self.status = Cancel.CANCELED
-                return True
-            else:
+            if self.status != Cancel.WILL_RUN:
                 return False
+            self.status = Cancel.CANCELED
+        if self.clock is not None:
+            self.clock.cancel(self.thread)
+        return True
 
 
 class Process:
@@ -49,14 +52,11 @@ class Process:
             if action:
                 action()
             self.clock.deregister()
-        
-        thread = threading.Thread(target=_run, daemon=True)
-        self.clock.register(thread)
-        thread.start()
-        return thread
+
+        return self.clock.start_thread(_run)
 
     def run_thread_can_cancel(self, action, delay=0.0):
-        cancel = Cancel()
+        cancel = Cancel(self.clock)
 
         def _actions():
             if delay > 0:
@@ -64,16 +64,28 @@ class Process:
             if cancel.try_run() and action is not None:
                 action()
             self.clock.deregister()
-        thread = threading.Thread(target=_actions, daemon=True)
-        self.clock.register(thread)
-        thread.start()
+        cancel.thread = self.clock.start_thread(_actions)
+        return cancel
+
+    # a scheduled action runs within the clock's scheduler (see
+    # Clock.call_at) and must not wait; run_thread runs one that does
+    def schedule(self, action, delay=0.0):
+        return self.clock.call_at(self.time() + delay, action)
+
+    def schedule_can_cancel(self, action, delay=0.0):
+        cancel = Cancel(self.clock)
+
+        def _action():
+            if cancel.try_run():
+                action()
+        cancel.thread = self.schedule(_action, delay)
         return cancel
 
     def report_event(self):
         self.clock.report_event()
 
-    def wait_for_next_event(self):
-        self.clock.wait_for_next_event()
+    def wait_for_next_event(self, reason=None):
+        self.clock.wait_for_next_event(reason)
 
     def wait_until(self, time):
         self.clock.wait_until(time)
@@ -85,9 +97,14 @@ class Process:
         self.clock.wait_for_all()
 
     def log(self, message, source=None):
-        if source is None:
-            source = self.name
-        self.clock.log(message, source)
+        if self.clock.sink is not None:
+            self.clock.log(message, source or self.name)
+
+    def log_format(self, message, *args):
+        # the message is a format string for args, formatted only once a
+        # sink records it
+        if self.clock.sink is not None:
+            self.clock.log(message, self.name, args)
 
     def debug(self, message, source=None):
         if source is None:
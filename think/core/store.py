@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import time
+
+from .analysis import Data, Result, Values
+from .world import Task
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, model TEXT, params TEXT, seed INTEGER,
+    created REAL);
+CREATE INDEX IF NOT EXISTS runs_key ON runs (model, params, seed);
+CREATE TABLE IF NOT EXISTS outputs (
+    run_id INTEGER, name TEXT, kind TEXT, size INTEGER);
+CREATE INDEX IF NOT EXISTS outputs_run ON outputs (run_id, name);
+CREATE TABLE IF NOT EXISTS observations (
+    run_id INTEGER, name TEXT, cell INTEGER, value REAL);
+CREATE INDEX IF NOT EXISTS observations_run ON observations (run_id, name);
+CREATE TABLE IF NOT EXISTS events (
+    run_id INTEGER, name TEXT, time REAL, event TEXT);
+CREATE INDEX IF NOT EXISTS events_run ON events (run_id, name);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER, name TEXT, r REAL, rmse REAL, nrmse REAL);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics (run_id, name);
+'''
+
+
+def _params_key(params):
+    return json.dumps(params or {}, sort_keys=True)
+
+
+def _outputs(result, name=''):
+    # yields (name, output) for each Data, Values, Task and Result in a
+    # result, naming nested items by their index or key
+    if isinstance(result, (Data, Values, Task, Result)):
+        yield name, result
+    elif isinstance(result, (tuple, list)):
+        for i, item in enumerate(result):
+            yield from _outputs(item, _join(name, i))
+    elif isinstance(result, dict):
+        for key, item in result.items():
+            yield from _outputs(item, _join(name, key))
+
+
+def _join(name, key):
+    return '{}.{}'.format(name, key) if name else str(key)
+
+
+class ResultStore:
+    '''SQLite store of per-replication simulation outputs.
+
+    Each run is a row keyed by model name, parameters and seed, with its
+    Data and Values observations, Task events and Result metrics in
+    tables indexed by run. The store pickles as just its path and opens
+    its connection lazily, so worker processes can each append their own
+    runs; the database uses write-ahead logging so they can write
+    concurrently.
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def connection(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._pid = os.getpid()
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def add_run(self, model, params=None, seed=None, result=None):
+        conn = self.connection()
+        with conn:
+            run_id = conn.execute(
+                'INSERT INTO runs (model, params, seed, created) '
+                'VALUES (?, ?, ?, ?)',
+                (model, _params_key(params), seed, time.time())).lastrowid
+            for name, output in _outputs(result):
+                self._add_output(conn, run_id, name, output)
+        return run_id
+
+    def _add_output(self, conn, run_id, name, output):
+        if isinstance(output, Data):
+            conn.execute('INSERT INTO outputs VALUES (?, ?, ?, ?)',
+                         (run_id, name, 'data', len(output.values_list)))
+            conn.executemany(
+                'INSERT INTO observations VALUES (?, ?, ?, ?)',
+                ((run_id, name, cell, value)
+                 for cell, values in enumerate(output.values_list)
+                 for value in values.v))
+        elif isinstance(output, Values):
+            conn.execute('INSERT INTO outputs VALUES (?, ?, ?, ?)',
+                         (run_id, name, 'values', output.size()))
+            conn.executemany(
+                'INSERT INTO observations VALUES (?, ?, ?, ?)',
+                ((run_id, name, 0, value) for value in output.v))
+        elif isinstance(output, Task):
+            conn.executemany(
+                'INSERT INTO events VALUES (?, ?, ?, ?)',
+                ((run_id, name, t, str(event)) for t, event in output.events))
+        elif isinstance(output, Result):
+            conn.execute('INSERT INTO metrics VALUES (?, ?, ?, ?, ?)',
+                         (run_id, name, output.r, output.rmse, output.nrmse))
+
+    def runs(self, model=None, params=None, seed=None):
+        query = 'SELECT id, model, params, seed FROM runs'
+        conditions = []
+        args = []
+        for column, value in (('model', model), ('seed', seed)):
+            if value is not None:
+                conditions.append(column + ' = ?')
+                args.append(value)
+        if params is not None:
+            conditions.append('params = ?')
+            args.append(_params_key(params))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return [(run_id, model, json.loads(params), seed)
+                for run_id, model, params, seed
+                in self.connection().execute(query + ' ORDER BY id', args)]
+
+    def data(self, run_id, name=''):
+        conn = self.connection()
+        row = conn.execute(
+            'SELECT kind, size FROM outputs WHERE run_id = ? AND name = ?',
+            (run_id, name)).fetchone()
+        if row is None:
+            return None
+        kind, size = row
+        rows = conn.execute(
+            'SELECT cell, value FROM observations '
+            'WHERE run_id = ? AND name = ? ORDER BY rowid', (run_id, name))
+        if kind == 'values':
+            return Values([value for _, value in rows])
+        data = Data(size)
+        for cell, value in rows:
+            data.add(cell, value)
+        return data
+
+    def merged(self, name='', model=None, params=None):
+        merged = None
+        for run_id, _, _, _ in self.runs(model, params):
+            data = self.data(run_id, name)
+            if data is None:
+                continue
+            if merged is None:
+                merged = data
+            else:
+                merged.extend(data)
+        return merged
+
+    def events(self, run_id, name=''):
+        return self.connection().execute(
+            'SELECT time, event FROM events WHERE run_id = ? AND name = ? '
+            'ORDER BY rowid', (run_id, name)).fetchall()
+
+    def metrics(self, run_id, name=''):
+        return self.connection().execute(
+            'SELECT r, rmse, nrmse FROM metrics WHERE run_id = ? AND name = ?',
+            (run_id, name)).fetchone()
@@ -0,0 +1,128 @@
+import functools
+import hashlib
+import itertools
+import os
+import pickle
+import sys
+
+from .world import _merge, _recorder, _run_jobs, _seeds
+
+
+def grid(axes):
+    names = list(axes)
+    return [dict(zip(names, values))
+            for values in itertools.product(*(axes[name] for name in names))]
+
+
+def set_params(obj, params):
+    # names are dotted attribute paths from obj, like 'memory.decay_rate';
+    # a method at the end of the path (like 'motor.wpm') is called instead
+    for name, value in params.items():
+        *path, attr = name.split('.')
+        target = obj
+        for part in path:
+            target = getattr(target, part)
+        current = getattr(target, attr, None)
+        if callable(current):
+            current(value)
+        else:
+            setattr(target, attr, value)
+    return obj
+
+
+def code_version(factory):
+    '''Returns a hash of the factory's module and the think sources.'''
+    module = sys.modules[getattr(factory, 'func', factory).__module__]
+    paths = [module.__file__]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for dir, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs
+                         if d not in ('tests', '__pycache__'))
+        paths.extend(os.path.join(dir, f) for f in sorted(files)
+                     if f.endswith('.py'))
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+class Sweep:
+    '''Runs a model factory at each of a list of parameter settings.
+
+    The factory must be a top-level callable taking a dict of parameters
+    and returning a result that World.run_many can merge. Every point runs
+    the same n replication seeds. With a cache directory, each finished
+    point is saved under a hash of its parameters, the code version, the
+    seed and n, and later runs only compute points not already saved. With
+    a ResultStore, every replication that runs is also saved there under
+    the model name, its parameters and its seed.
+    '''
+
+    def __init__(self, factory, n=1, seed=0, workers=None, cache_dir=None,
+                 version=None, store=None, model=None):
+        self.factory = factory
+        self.n = n
+        self.seed = seed
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.version = version or code_version(factory)
+        self.store = store
+        self.model = model
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, params):
+        text = repr((sorted(params.items()), self.version, self.seed, self.n))
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _path(self, params):
+        return os.path.join(self.cache_dir, self.key(params) + '.pickle')
+
+    def _load(self, params):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(params), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _store(self, params, result):
+        if self.cache_dir is None:
+            return
+        path = self._path(params)
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump((params, result), f)
+        os.replace(tmp_path, path)
+
+    def run(self, points):
+        if isinstance(points, dict):
+            points = grid(points)
+        results = [None] * len(points)
+        seeds = _seeds(self.n, self.seed)
+        jobs = []
+        owners = []
+        for i, params in enumerate(points):
+            cached = self._load(params)
+            if cached is not None:
+                results[i] = cached[1]
+                continue
+            factory = functools.partial(self.factory, params)
+            record = _recorder(self.store, self.factory, self.model, params)
+            for seed in seeds:
+                jobs.append((factory, seed, record))
+                owners.append(i)
+        done = {}
+
+        def on_result(j, result):
+            i = owners[j]
+            done.setdefault(i, []).append((j, result))
+            if len(done[i]) == self.n:
+                result = _merge([r for _, r in sorted(done.pop(i),
+                                                      key=lambda x: x[0])])
+                results[i] = result
+                self._store(points[i], result)
+        _run_jobs(jobs, self.workers, on_result)
+        return list(zip(points, results))
@@ -1,6 +1,6 @@
 import unittest
 
-from think import Agent, Memory, Speech
+from think import Agent, Memory, Speech, Worker
 
 
 class AgentTest(unittest.TestCase):
@@ -38,3 +38,32 @@ class AgentTest(unittest.TestCase):
             memory.recall('item')
         agent.wait_for_all()
         self.assertAlmostEqual(1.200, agent.time(), 2)
+
+    def test_worker_queue(self, output=False):
+        agent = Agent(output=output)
+        stats = agent.clock.enable_stats()
+        worker = Worker('worker', agent)
+        order = []
+        freed = []
+
+        def user(i):
+            def fn():
+                agent.wait(i / 100)
+                worker.acquire()
+                order.append(i)
+                agent.wait(1.0)
+                worker.release()
+            return fn
+        for i in range(20):
+            agent.run_thread(user(i))
+
+        def watcher():
+            agent.wait(.5)
+            worker.wait_until_free()
+            freed.append(agent.time())
+        agent.run_thread(watcher)
+        agent.wait_for_all()
+        self.assertEqual(list(range(20)), order)
+        self.assertEqual([1.0], freed)
+        self.assertAlmostEqual(20.0, agent.time(), 2)
+        self.assertLess(stats.wakeups, 100)
@@ -0,0 +1,349 @@
+import asyncio
+import logging
+import threading
+import time
+import unittest
+
+from think import (Agent, Environment, GreenletClock, Memory, Motor, Speech,
+                   Task, Vision, World)
+from think.core.clock import _PooledThread, _thread_pool
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+
+class ClockTest(unittest.TestCase):
+
+    def test_timed_order(self, output=False):
+        agent = Agent(output=output)
+        woken = []
+
+        def waiter(i):
+            def fn():
+                agent.wait(i / 10)
+                woken.append((i, round(agent.time(), 3)))
+            return fn
+        for i in reversed(range(1, 51)):
+            agent.run_thread(waiter(i))
+        agent.wait_for_all()
+        self.assertEqual([(i, i / 10) for i in range(1, 51)], woken)
+        self.assertAlmostEqual(5.0, agent.time(), 2)
+
+    def test_think_contention(self, output=False):
+        agent = Agent(output=output)
+        thoughts = []
+
+        def thinker(i):
+            def fn():
+                agent.wait(i / 100)
+                agent.think('thought {}', i)
+                thoughts.append(i)
+            return fn
+        for i in range(10):
+            agent.run_thread(thinker(i))
+        agent.wait_for_all()
+        self.assertEqual(list(range(10)), sorted(thoughts))
+        self.assertAlmostEqual(.5, agent.time(), 2)
+
+    def test_thread_reuse(self, output=False):
+        agent = Agent(output=output)
+        threads = set()
+        for _ in range(20):
+            threads.add(agent.run_thread(None, .1))
+            agent.wait(.2)
+        agent.wait_for_all()
+        self.assertAlmostEqual(4.0, agent.time(), 2)
+        self.assertLess(len(threads), 20)
+
+    def test_thread_reuse_in_one_slice(self, output=False):
+        # a pooled thread can finish, be reused and finish again before the
+        # scheduler cycles, with no simulated time passing in between
+        agent = Agent(output=output)
+        for _ in range(50):
+            agent.run_thread(lambda: None)
+            time.sleep(.002)
+        agent.wait_for_all()
+        for _ in range(20):
+            agent.run_thread_can_cancel(lambda: None, 1.0).try_cancel()
+            time.sleep(.002)
+        agent.wait_for_all()
+
+    def test_idle_limit(self, output=False):
+        agent = Agent(output=output)
+        for _ in range(_thread_pool.limit + 50):
+            agent.run_thread(None, 1.0)
+        agent.wait_for_all()
+        # the threads beyond the limit exit once they finish
+        for _ in range(500):
+            pooled = [thread for thread in threading.enumerate()
+                      if isinstance(thread, _PooledThread)]
+            if len(pooled) <= _thread_pool.limit:
+                break
+            time.sleep(.01)
+        self.assertLessEqual(len(pooled), _thread_pool.limit)
+        self.assertLessEqual(len(_thread_pool.idle), _thread_pool.limit)
+
+    def test_stats(self, output=False):
+        agent = Agent(output=output)
+        self.assertIsNone(agent.clock.stats())
+        snapshots = []
+        agent.clock.enable_stats(snapshots.append, interval=0)
+        for _ in range(5):
+            agent.run_thread(lambda: agent.wait(1.0))
+        agent.wait_for_all()
+        stats = agent.clock.stats()
+        self.assertEqual(5, stats['registered'])
+        self.assertEqual(5, stats['deregistered'])
+        self.assertEqual(1, stats['live_threads'])
+        self.assertEqual(0, stats['idle_wakeups'])
+        self.assertGreater(stats['cycles'], 0)
+        self.assertGreater(stats['wakeups'], 0)
+        self.assertAlmostEqual(1.0, stats['sim_time'], 2)
+        self.assertIsNotNone(stats['wall_per_sim'])
+        self.assertEqual(stats['cycles'], len(snapshots))
+
+    def test_fast_forward(self, output=False):
+        agent = Agent(output=output)
+        stats = agent.clock.enable_stats()
+        ticks = []
+
+        def ticker():
+            for _ in range(10):
+                agent.wait(1.0)
+                ticks.append(agent.time())
+        agent.run_thread(ticker)
+        agent.wait(5.5)
+        self.assertAlmostEqual(5.5, agent.time(), 2)
+        agent.wait_for_all()
+        self.assertEqual([float(i) for i in range(1, 11)], ticks)
+        self.assertGreaterEqual(stats.fast_forwards, 4)
+
+    def test_real_time(self, output=False):
+        agent = Agent(output=output)
+        agent.clock.set_real_time(True, speed=20)
+        start = time.monotonic()
+        for _ in range(20):
+            agent.wait(.1)
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, .09)
+        self.assertLess(elapsed, .5)
+
+        agent.clock.set_real_time(True, speed=10)
+        agent.wait(.1)
+        time.sleep(.2)
+        agent.wait(1.0)
+        self.assertGreater(agent.clock.lag(), .05)
+        agent.wait(2.0)
+        self.assertEqual(0.0, agent.clock.lag())
+
+        agent.clock.set_real_time(True, speed=10, catch_up=False)
+        agent.wait(.1)
+        time.sleep(.2)
+        agent.wait(.1)
+        start = time.monotonic()
+        agent.wait(.5)
+        self.assertGreater(time.monotonic() - start, .04)
+        self.assertGreater(agent.clock.lag(), .05)
+
+    def test_cancel(self, output=False):
+        agent = Agent(output=output)
+        stats = agent.clock.enable_stats()
+        ran = []
+        cancels = [agent.run_thread_can_cancel(lambda i=i: ran.append(i), 1.0)
+                   for i in range(3)]
+        agent.wait(.5)
+        self.assertTrue(cancels[0].try_cancel())
+        self.assertTrue(cancels[1].try_cancel())
+        self.assertFalse(cancels[1].try_cancel())
+        agent.wait_for_all()
+        self.assertEqual([2], ran)
+        self.assertFalse(cancels[2].try_cancel())
+        self.assertEqual(2, stats.canceled)
+
+        cancel = agent.run_thread_can_cancel(lambda: ran.append(3), 1.0)
+        agent.wait(.5)
+        cancel.try_cancel()
+        agent.wait_for_all()
+        self.assertEqual([2], ran)
+        self.assertAlmostEqual(1.5, agent.time(), 2)
+
+    def test_call_at(self, output=False):
+        agent = Agent(output=output)
+        stats = agent.clock.enable_stats()
+        calls = []
+
+        def call(i):
+            calls.append((i, round(agent.time(), 3)))
+            agent.wait_for_next_event()
+        for i in reversed(range(1, 6)):
+            agent.clock.call_at(i / 10, lambda i=i: call(i))
+        cancel = agent.schedule_can_cancel(lambda: call(0), .25)
+        agent.wait(.2)
+        self.assertTrue(cancel.try_cancel())
+        agent.wait_for_all()
+        self.assertEqual([(i, i / 10) for i in range(1, 6)], calls)
+        self.assertEqual(0, stats.registered)
+        self.assertEqual(1, stats.canceled)
+        self.assertAlmostEqual(.5, agent.time(), 2)
+
+        agent.schedule(lambda: agent.wait(1.0), .1)
+        with self.assertRaises(Exception) as cm:
+            agent.wait_for_all()
+        self.assertIn('failed in a scheduled call', str(cm.exception))
+
+        # the error reaches every waiter, whichever thread ran the call
+        agent = Agent(output=output)
+        agent.schedule(lambda: agent.wait(1.0), .1)
+        agent.run_thread(lambda: agent.wait(.2))
+        with self.assertRaises(Exception) as cm:
+            agent.wait_for_all()
+        self.assertIn('failed in a scheduled call', str(cm.exception))
+
+    def test_lazy_trace(self):
+        formatted = []
+
+        class Arg:
+            def __str__(self):
+                formatted.append(self)
+                return 'arg'
+
+        agent = Agent(output=False)
+        agent.think('think {}', Arg())
+        agent.log_format('log {}', Arg())
+        self.assertEqual([], formatted)
+
+        records = []
+        logger = logging.getLogger('think.test_lazy_trace')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = logging.Handler()
+        handler.emit = lambda record: records.append(
+            (record.source, record.getMessage()))
+        logger.addHandler(handler)
+        agent = Agent(output=logger)
+        agent.think('think {}', Arg())
+        agent.log_format('log {} {}', Arg(), 2)
+        agent.log('log {}', 'source')
+        logger.removeHandler(handler)
+        self.assertEqual(2, len(formatted))
+        self.assertEqual([('agent', 'think arg'), ('agent', 'log arg 2'),
+                          ('source', 'log {}')], records)
+
+    def test_deadlock(self, output=False):
+        env = Environment()
+        agent = Agent(output=output)
+        vision = Vision(agent, env.display)
+        env.display.add_text(10, 10, 'A')
+        vision.start_find(isa='text')
+        with self.assertRaises(Exception) as cm:
+            vision.start_find(isa='text')
+        self.assertIn('deadlocked at time 0.050', str(cm.exception))
+        self.assertIn('waiting for agent.vision.find, '
+                      'holding agent.vision.find', str(cm.exception))
+
+    def test_stall(self, output=False):
+        agent = Agent(output=output)
+        agent.clock.stall_limit = 100
+
+        def ping():
+            while True:
+                agent.report_event()
+                agent.wait_for_next_event()
+        agent.run_thread(ping)
+        agent.run_thread(ping)
+        with self.assertRaises(Exception) as cm:
+            agent.wait_for_all()
+        self.assertIn('stalled for 101 cycles', str(cm.exception))
+
+
+@unittest.skipUnless(greenlet, 'greenlet is not installed')
+class GreenletClockTest(unittest.TestCase):
+
+    def test_agent(self, output=False):
+        agent = Agent(clock=GreenletClock(output=output))
+        agent.wait(10.0)
+        self.assertAlmostEqual(10.0, agent.time(), 2)
+        agent.run_thread(lambda: agent.wait(5.0))
+        agent.wait(2.0)
+        self.assertAlmostEqual(12.0, agent.time(), 2)
+        agent.wait_for_all()
+        self.assertAlmostEqual(15.0, agent.time(), 2)
+
+    def test_threads(self, output=False):
+        agent = Agent(clock=GreenletClock(output=output))
+        memory = Memory(agent)
+        memory.add(isa='item')
+        memory.add(isa='number', value='three')
+        speech = Speech(agent)
+
+        def thread2():
+            for _ in range(2):
+                number = memory.recall(isa='number')
+                speech.say(number.value)
+        agent.run_thread(thread2)
+        agent.wait(.100)
+        for _ in range(2):
+            memory.recall('item')
+        agent.wait_for_all()
+        self.assertAlmostEqual(1.000, agent.time(), 2)
+
+    def test_typing(self, output=False):
+        agent = Agent(clock=GreenletClock(output=output))
+        env = Environment()
+        vision = Vision(agent, env.display)
+        motor = Motor(agent, vision, env)
+        motor.type('Hello there. What\'s up?')
+        agent.wait_for_all()
+        self.assertAlmostEqual(6.597, agent.time(), 1)
+
+    def test_cancel(self, output=False):
+        agent = Agent(clock=GreenletClock(output=output))
+        ran = []
+        cancel = agent.run_thread_can_cancel(lambda: ran.append(1), 1.0)
+        agent.run_thread_can_cancel(lambda: ran.append(2), 2.0)
+        agent.wait(.5)
+        self.assertTrue(cancel.try_cancel())
+        agent.wait_for_all()
+        self.assertEqual([2], ran)
+        self.assertAlmostEqual(2.0, agent.time(), 2)
+
+    def test_deadlock(self, output=False):
+        agent = Agent(clock=GreenletClock(output=output))
+        agent.run_thread(agent.wait_for_next_event)
+        with self.assertRaises(Exception) as cm:
+            agent.wait_for_next_event()
+        self.assertIn('deadlocked', str(cm.exception))
+        self.assertIn('thread 2 (event_wait)', str(cm.exception))
+
+
+class _TickTask(Task):
+
+    def run(self, time):
+        while self.time() < time:
+            self.wait(1.0)
+            self.record('tick')
+
+
+@unittest.skipUnless(greenlet, 'greenlet is not installed')
+class RunAsyncTest(unittest.TestCase):
+
+    def test_run_async(self):
+        tasks = [_TickTask(clock=GreenletClock(output=False))
+                 for _ in range(3)]
+        ticks = []
+
+        async def ticker():
+            while len(ticks) < 10:
+                ticks.append(sum(len(task.events) for task in tasks))
+                await asyncio.sleep(0)
+
+        async def main():
+            worlds = [World(task).run_async(20) for task in tasks]
+            await asyncio.gather(ticker(), *worlds)
+        asyncio.run(main())
+        for task in tasks:
+            self.assertEqual(20, len(task.events))
+            self.assertAlmostEqual(20.0, task.time(), 2)
+        self.assertLess(ticks[1], 60)
@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from think import Data, Fit
+
+HUMAN = [1.0, 2.0, 3.0]
+
+
+def _model(params):
+    data = Data(3)
+    for i, h in enumerate(HUMAN):
+        data.add(i, params['scale'] * h + params.get('shift', 0)
+                 + random.gauss(0, .05))
+    return data, data
+
+
+def _mean_error(result):
+    return abs(result[0].means().mean() - 2.0)
+
+
+class FitTest(unittest.TestCase):
+
+    def test_nelder_mead(self):
+        fit = Fit(_model, (HUMAN, HUMAN), {'scale': (0, 3), 'shift': (-1, 1)},
+                  metric='rmse', n=8, n_min=2, workers=1)
+        params, score = fit.run()
+        self.assertAlmostEqual(1.0, params['scale'], 1)
+        self.assertAlmostEqual(0.0, params['shift'], 1)
+        self.assertLess(score, .1)
+        counts = [c.n() for c in fit.candidates.values()]
+        self.assertIn(2, counts)
+        self.assertIn(8, counts)
+
+    def test_coordinate(self):
+        fit = Fit(_model, (HUMAN, HUMAN), {'scale': (0, 3)},
+                  metric=_mean_error, method='coordinate', n=4, workers=1,
+                  start={'scale': 2.0})
+        params, score = fit.run()
+        self.assertAlmostEqual(1.0, params['scale'], 1)
+        self.assertLess(fit.n_evals(), fit.max_evals)
+
+    def test_workers(self):
+        fits = [Fit(_model, (HUMAN, HUMAN), {'scale': (0, 3)},
+                    method='coordinate', n=2, workers=workers, max_evals=6)
+                for workers in (1, 2)]
+        results = [fit.run() for fit in fits]
+        self.assertEqual(results[0], results[1])
+        self.assertIsNone(fits[1]._pool)
@@ -1,4 +1,5 @@
 import unittest
+import weakref
 
 from think import Area, Item, Location, Query
 
@@ -32,6 +33,46 @@ class ItemTest(unittest.TestCase):
         self.assertFalse(item.matches(item2))
         self.assertTrue(item2.matches(item))
 
+    def test_slots(self):
+        item = Item(slot='val')
+        item.slot = 'val2'
+        item.other = 'other'
+        self.assertEqual({'slot': 'val2'}, item.slots)
+        self.assertIsNone(item.get('other'))
+        self.assertFalse(item.has('other'))
+        self.assertIs(item._layout, Item(slot=1)._layout)
+
+        area = Area(10, 20, 4, 2)
+        area.move(12, 20)
+        self.assertEqual({'isa': 'area', 'x': 12, 'y': 20, 'w': 4, 'h': 2},
+                         area.slots)
+        self.assertEqual(8, area.x1)
+        self.assertFalse(area.has('x1'))
+
+        slots = item.slots
+        slots['slot'] = 'val3'
+        self.assertEqual('val2', item.get('slot'))
+        self.assertIs(item, weakref.ref(item)())
+
+        # slots named like methods do not hide them
+        item = Item(isa='t', get=3)
+        self.assertEqual('t', item.get('isa'))
+        self.assertEqual(3, item.get('get'))
+        self.assertEqual({'isa': 't', 'get': 3}, item.slots)
+        self.assertTrue(item.equals(Item(get=3, isa='t')))
+        self.assertFalse(item.matches(Item(get=4)))
+        self.assertTrue(Query(get=3, isa='t').matches(item))
+        self.assertFalse(Query(get=4).matches(item))
+        item.set('matches', 3).set('get', 4)
+        self.assertTrue(item.matches(Item(matches=3, get=4)))
+        item.unset('matches')
+        self.assertFalse(item.has('matches'))
+        area.set('move', 3)
+        self.assertEqual(3, area.get('move'))
+        area.move(14, 20)
+        self.assertEqual(14, area.get('x'))
+        self.assertEqual(3, Item(move=3).move)
+
 
 class QueryTest(unittest.TestCase):
 
@@ -67,6 +108,20 @@ class QueryTest(unittest.TestCase):
         self.assertFalse(Query().le('slot', 2).matches(item))
         self.assertTrue(Query().le('slot', 4).matches(item))
 
+    def test_filter(self):
+        items = [Item(isa='n', value=i) for i in range(10)]
+        items.append(Item(value=3))
+        query = Query(isa='n')
+        self.assertEqual(10, len(query.filter(items)))
+        matches = query.compile()
+        self.assertIs(matches, query.compile())
+        query.ge('value', 3).lt('value', 5)
+        self.assertIsNot(matches, query.compile())
+        self.assertEqual([3, 4], [item.value
+                                  for item in query.filter(items)])
+        self.assertEqual(1, len(Query(isa=None, value=3).filter(items)))
+        self.assertEqual(items, Query().filter(items))
+
 
 class LocationTest(unittest.TestCase):
 
@@ -0,0 +1,65 @@
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+from think import Clock, Data, Result, ResultStore, Sweep, Task, Values, World
+
+
+def _model(params=None):
+    task = Task(clock=Clock(output=False))
+    data = Data(2)
+    for i in range(2):
+        value = random.random() + (params or {}).get('offset', 0)
+        data.add(i, value)
+        task.record('cell {}'.format(i))
+    return data, Values([1.0]), task, Result(Values([.5, .6]), [.5, .7])
+
+
+class StoreTest(unittest.TestCase):
+
+    def test_store(self):
+        with tempfile.TemporaryDirectory() as dir:
+            store = ResultStore(os.path.join(dir, 'results.db'))
+            merged = World.run_many(_model, 3, workers=1, seed=1, store=store)
+            runs = store.runs(model='_model')
+            self.assertEqual(3, len(runs))
+            run_id, model, params, seed = runs[0]
+            self.assertEqual({}, params)
+
+            data = store.data(run_id, '0')
+            self.assertEqual(2, len(data.values_list))
+            self.assertEqual(merged[0].values_list[0].v[0],
+                             data.values_list[0].v[0])
+            self.assertEqual([1.0], store.data(run_id, '1').v)
+            self.assertEqual(['cell 0', 'cell 1'],
+                             [e for _, e in store.events(run_id, '2')])
+            self.assertAlmostEqual(merged[3][0].rmse,
+                                   store.metrics(run_id, '3')[1], 6)
+            self.assertEqual(merged[0].values_list[1].v,
+                             store.merged('0', model='_model')
+                             .values_list[1].v)
+            self.assertIsNone(store.data(run_id, 'missing'))
+
+            store = pickle.loads(pickle.dumps(store))
+            sweep = Sweep(_model, n=2, workers=1, store=store, model='m',
+                          version='v')
+            sweep.run({'offset': [0, 10]})
+            self.assertEqual(2, len(store.runs(model='m',
+                                               params={'offset': 10})))
+            data = store.merged('0', 'm', {'offset': 10})
+            self.assertGreater(data.means().mean(), 10)
+            self.assertEqual(seed, store.runs(seed=seed)[0][3])
+
+            merged = World.run_many(_model, 2, workers=2, seed=2, store=store,
+                                    model='parallel')
+            runs = store.runs(model='parallel')
+            self.assertEqual(2, len(runs))
+            self.assertEqual([['cell 0', 'cell 1']] * 2,
+                             [[e for _, e in task.events]
+                              for task in merged[2]])
+            self.assertIsNone(merged[2][0].clock)
+            self.assertEqual(['cell 0', 'cell 1'],
+                             [e for _, e in store.events(runs[1][0], '2')])
+            store.close()
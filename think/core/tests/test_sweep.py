@@ -0,0 +1,53 @@
+import tempfile
+import unittest
+
+from think import (Agent, Environment, Motor, Sweep, Values, Vision, grid,
+                   set_params)
+
+_calls = []
+
+
+def _model(params):
+    _calls.append(params)
+    env = Environment()
+    agent = Agent(output=False)
+    agent.vision = Vision(agent, env.display)
+    agent.motor = Motor(agent, agent.vision, env)
+    set_params(agent, params)
+    agent.think('think')
+    agent.motor.type('a')
+    agent.wait_for_all()
+    return Values([agent.time()])
+
+
+class SweepTest(unittest.TestCase):
+
+    def test_grid(self):
+        self.assertEqual([{'a': 1, 'b': 3}, {'a': 1, 'b': 4},
+                          {'a': 2, 'b': 3}, {'a': 2, 'b': 4}],
+                         grid({'a': [1, 2], 'b': [3, 4]}))
+
+    def test_sweep(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            del _calls[:]
+            sweep = Sweep(_model, n=2, workers=1, cache_dir=cache_dir)
+            axes = {'think_time': [.05, .1], 'motor.wpm': [40]}
+            results = sweep.run(axes)
+            self.assertEqual(4, len(_calls))
+            self.assertEqual(grid(axes), [params for params, _ in results])
+            times = [values.mean() for _, values in results]
+            self.assertAlmostEqual(.1, times[1] - times[0], 3)
+            self.assertEqual(2, results[0][1].size())
+
+            del _calls[:]
+            axes['think_time'].append(.2)
+            results2 = sweep.run(axes)
+            self.assertEqual([{'think_time': .2, 'motor.wpm': 40}] * 2,
+                             _calls)
+            self.assertEqual(results[0][1].v, results2[0][1].v)
+
+            del _calls[:]
+            sweep = Sweep(_model, n=2, workers=1, cache_dir=cache_dir,
+                          version='other')
+            sweep.run([{'think_time': .05}])
+            self.assertEqual(2, len(_calls))
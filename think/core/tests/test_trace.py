@@ -0,0 +1,96 @@
+import io
+import os
+import tempfile
+import unittest
+
+from think import (Agent, Item, Memory, TraceRecorder, Worker, read_trace,
+                   trace_to_text)
+
+
+class TraceTest(unittest.TestCase):
+
+    def run_agent(self, recorder):
+        agent = Agent(output=recorder)
+        memory = Memory(agent)
+        memory.add(isa='digit', value=1)
+        for _ in range(3):
+            memory.recall(isa='digit')
+            agent.wait(1.0)
+        return agent
+
+    def test_recorder(self):
+        recorder = TraceRecorder()
+        self.run_agent(recorder)
+        events = list(recorder.events())
+        self.assertEqual(9, len(recorder))
+        self.assertEqual(('agent', 'recall {}', ('[isa=digit]',)),
+                         events[0][1:])
+        self.assertEqual(['recall {}', 'recalling {}', 'recalled {}'],
+                         recorder.code_formats)
+        self.assertEqual('       0.050      agent.memory            '
+                         'recalling [isa=digit]', list(recorder.lines())[1])
+        self.assertTrue(all(e1[0] <= e2[0]
+                            for e1, e2 in zip(events, events[1:])))
+
+    def test_ring(self):
+        recorder = TraceRecorder(capacity=4)
+        for i in range(10):
+            recorder.event(float(i), 'src', 'event {}', (i,))
+        self.assertEqual(4, len(recorder))
+        self.assertEqual(6, recorder.dropped)
+        self.assertEqual([6.0, 7.0, 8.0, 9.0],
+                         [e[0] for e in recorder.events()])
+
+    def test_snapshot_args(self):
+        recorder = TraceRecorder()
+        item = Item(value=1)
+        recorder.event(0.0, 'src', 'item {}', (item,))
+        item.set('value', 2)
+        self.assertEqual('item {\'value\': 1}',
+                         list(recorder.lines('%(message)s'))[0])
+
+    def test_delayed_args(self):
+        recorder = TraceRecorder()
+        agent = Agent(output=recorder)
+        item = Item(value=1)
+        worker = Worker('worker', agent)
+        worker.run(1.0, 'ran {}', release=False, args=(item,))
+        worker.schedule(1.0, 'scheduled {}', release=False, args=(item,))
+        item.set('value', 2)
+        agent.wait_for_all()
+        self.assertEqual(['ran {\'value\': 1}', 'scheduled {\'value\': 1}'],
+                         sorted(recorder.lines('%(message)s')))
+
+    def test_dump(self):
+        with tempfile.TemporaryDirectory() as dir:
+            recorder = TraceRecorder(capacity=4)
+            for i in range(10):
+                recorder.event(float(i), 'src', 'event {}', (i,))
+            path = os.path.join(dir, 'ring.trace')
+            recorder.dump(path)
+            self.assertEqual(list(recorder.lines()),
+                             [line for line in self.text(path)])
+
+            path = os.path.join(dir, 'full.trace')
+            recorder = TraceRecorder(capacity=4, path=path)
+            agent = self.run_agent(recorder)
+            recorder.close()
+            events = list(read_trace(path))
+            self.assertEqual(9, len(events))
+            self.assertEqual(('agent', 'recall {}', ('[isa=digit]',)),
+                             events[0][1:])
+            self.assertAlmostEqual(agent.time(), events[-1][0] + 1.0, 2)
+
+            recorder.close()
+            recorder.flush()
+            self.assertEqual(9, len(list(read_trace(path))))
+            recorder.event(100.0, 'src', 'event {}', (1,))
+            recorder.close()
+            events = list(read_trace(path))
+            self.assertEqual(10, len(events))
+            self.assertEqual((100.0, 'src', 'event {}', ('1',)), events[-1])
+
+    def text(self, path):
+        out = io.StringIO()
+        trace_to_text(path, out)
+        return out.getvalue().splitlines()
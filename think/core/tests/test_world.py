@@ -0,0 +1,77 @@
+import random
+import unittest
+
+from think import (Agent, Data, Environment, Motor, Task, Values, Vision,
+                   World)
+
+
+def _replication():
+    agent = Agent(output=False)
+    data = Data(2)
+    values = Values()
+    for i in range(2):
+        agent.wait(random.random())
+        data.add(i, agent.time())
+    values.add(random.random())
+    return data, {'values': values}
+
+
+def _noisy():
+    data = Data(3)
+    data.add(0, random.gauss(0, 1))
+    data.add(1, 1.0)
+    return data
+
+
+class WorldTest(unittest.TestCase):
+
+    def test_run_many(self):
+        state = random.getstate()
+        data, results = World.run_many(_replication, 4, workers=1, seed=1)
+        self.assertEqual(state, random.getstate())
+        self.assertEqual([4, 4], [v.size() for v in data.values_list])
+        self.assertEqual(4, results['values'].size())
+
+        data2, results2 = World.run_many(_replication, 4, workers=2, seed=1)
+        self.assertEqual(data.values_list[1].v, data2.values_list[1].v)
+        self.assertEqual(results['values'].v, results2['values'].v)
+        self.assertIsNone(World.run_many(_replication, 0))
+
+    def test_shared_clock(self):
+        env = Environment()
+        task = Task()
+        keys = []
+        env.keyboard.add_type_fn(keys.append, 'b')
+        agents = []
+        for key in 'ab':
+            agent = Agent(output=False)
+            agent.vision = Vision(agent, env.display)
+            agent.motor = Motor(agent, agent.vision, env)
+            agent.run = lambda time, agent=agent, key=key: agent.motor.type(
+                agent.vision.encode(agent.vision.wait_for(isa='text')) + key)
+            agents.append(agent)
+        task.run = lambda time: env.display.add_text(10, 10, 'x')
+        World(task, *agents).run(1)
+        self.assertIs(agents[0].clock, agents[1].vision.clock)
+        self.assertEqual(2, len(env.display.visions))
+        self.assertEqual({}, env.display.waiters)
+        self.assertEqual(['b'], keys)
+
+    def test_run_until_precise(self):
+        data, n = World.run_until_precise(_noisy, .5, batch=3, seed=1)
+        self.assertEqual(n, data.values_list[0].size())
+        self.assertGreater(n, 4)
+        self.assertLessEqual(data.values_list[0].ci(), .5)
+        self.assertEqual(0, data.values_list[2].size())
+        self.assertIsNone(data.values_list[2].ci())
+
+        data, n = World.run_until_precise(_noisy, .01, max_n=10, batch=3,
+                                          seed=1)
+        self.assertEqual(10, n)
+        self.assertGreater(data.values_list[0].ci(), .01)
+
+        runs = [World.run_until_precise(_noisy, .5, batch=3, workers=workers,
+                                        seed=2) for workers in (1, 2)]
+        self.assertEqual(runs[0][1], runs[1][1])
+        self.assertEqual(runs[0][0].values_list[0].v,
+                         runs[1][0].values_list[0].v)
@@ -0,0 +1,224 @@
+import struct
+import sys
+from array import array
+
+_MAGIC = b'THINKTR1'
+_SOURCE = b'S'
+_CODE = b'C'
+_EVENTS = b'E'
+_PLAIN = (str, int, float, bool, type(None))
+_TEXT_FORMAT = '%(time)12.3f      %(source)-18s      %(message)s'
+
+
+class TraceRecorder:
+    '''Clock output sink that records trace events into preallocated arrays.
+
+    Each event is stored as (time, source id, event code, args), where the
+    event code is the interned message format string. With no path, the
+    recorder is a ring buffer keeping the most recent `capacity` events; with
+    a path, every time the buffer fills it is appended to that file, so the
+    file holds the full trace. Arguments that are not plain values are
+    converted to strings when recorded, since they may change afterwards.
+    '''
+
+    def __init__(self, capacity=65536, path=None):
+        self.capacity = capacity
+        self.path = path
+        self.times = array('d', [0.0]) * capacity
+        self.sources = array('I', [0]) * capacity
+        self.codes = array('I', [0]) * capacity
+        self.args = [()] * capacity
+        self.count = 0
+        self.start = 0
+        self.dropped = 0
+        self.source_ids = {}
+        self.source_names = []
+        self.code_ids = {}
+        self.code_formats = []
+        self._file = None
+        self._started = False
+        self._written_sources = 0
+        self._written_codes = 0
+
+    def event(self, time, source, message, args):
+        sid = self.source_ids.get(source)
+        if sid is None:
+            sid = self.source_ids[source] = len(self.source_names)
+            self.source_names.append(source)
+        cid = self.code_ids.get(message)
+        if cid is None:
+            cid = self.code_ids[message] = len(self.code_formats)
+            self.code_formats.append(message)
+        if args:
+            args = _snapshot(args)
+        if self.count < self.capacity:
+            i = self.count
+            self.count += 1
+        elif self.path is not None:
+            self.flush()
+            i = 0
+            self.count = 1
+        else:
+            i = self.start
+            self.start = (i + 1) % self.capacity
+            self.dropped += 1
+        self.times[i] = time
+        self.sources[i] = sid
+        self.codes[i] = cid
+        self.args[i] = args
+
+    def __len__(self):
+        return self.count
+
+    def _order(self):
+        for k in range(self.count):
+            yield (self.start + k) % self.capacity
+
+    def events(self):
+        for i in self._order():
+            yield (self.times[i], self.source_names[self.sources[i]],
+                   self.code_formats[self.codes[i]], self.args[i])
+
+    def lines(self, formats=_TEXT_FORMAT):
+        return _format_lines(self.events(), formats)
+
+    def flush(self):
+        if self.path is None:
+            raise Exception('trace recorder has no path to flush to')
+        if self._file is None:
+            # appends after a close, rather than truncating the trace
+            if self._started:
+                self._file = open(self.path, 'ab')
+            else:
+                self._file = open(self.path, 'wb')
+                _write_header(self._file)
+                self._started = True
+        self._write_block(self._file, self._written_sources,
+                          self._written_codes)
+        self._written_sources = len(self.source_names)
+        self._written_codes = len(self.code_formats)
+        self._file.flush()
+        self.count = 0
+        self.start = 0
+
+    def close(self):
+        if self.path is None or (self._file is None and self.count == 0
+                                 and self._started):
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+
+    def dump(self, path):
+        with open(path, 'wb') as f:
+            _write_header(f)
+            self._write_block(f, 0, 0)
+
+    def _write_block(self, f, sources_from, codes_from):
+        for name in self.source_names[sources_from:]:
+            f.write(_SOURCE)
+            _write_str(f, name)
+        for fmt in self.code_formats[codes_from:]:
+            f.write(_CODE)
+            _write_str(f, fmt)
+        if self.count == 0:
+            return
+        order = list(self._order())
+        if self.start:
+            times = array('d', (self.times[i] for i in order))
+            sources = array('I', (self.sources[i] for i in order))
+            codes = array('I', (self.codes[i] for i in order))
+        else:
+            n = self.count
+            times, sources, codes = \
+                self.times[:n], self.sources[:n], self.codes[:n]
+        f.write(_EVENTS)
+        f.write(struct.pack('<Q', len(order)))
+        times.tofile(f)
+        sources.tofile(f)
+        codes.tofile(f)
+        for i in order:
+            args = self.args[i]
+            f.write(struct.pack('<H', len(args)))
+            for arg in args:
+                _write_str(f, str(arg))
+
+
+def _snapshot(args):
+    # arguments that are not plain values are converted to strings, since
+    # they may change before the event is formatted
+    for arg in args:
+        if not isinstance(arg, _PLAIN):
+            return tuple(a if isinstance(a, _PLAIN) else str(a) for a in args)
+    return args
+
+
+def _write_header(f):
+    f.write(_MAGIC)
+    f.write(b'<' if sys.byteorder == 'little' else b'>')
+    f.write(struct.pack('<B', array('I').itemsize))
+
+
+def _write_str(f, s):
+    b = s.encode('utf-8')
+    f.write(struct.pack('<I', len(b)))
+    f.write(b)
+
+
+def _read_exact(f, n):
+    b = f.read(n)
+    if len(b) != n:
+        raise Exception('truncated trace file')
+    return b
+
+
+def _read_str(f):
+    n, = struct.unpack('<I', _read_exact(f, 4))
+    return _read_exact(f, n).decode('utf-8')
+
+
+def read_trace(path):
+    '''Yields (time, source, message, args) events from a dumped trace.'''
+    with open(path, 'rb') as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise Exception('not a trace file: {}'.format(path))
+        swap = f.read(1) != (b'<' if sys.byteorder == 'little' else b'>')
+        itemsize, = struct.unpack('<B', _read_exact(f, 1))
+        if itemsize != array('I').itemsize:
+            raise Exception('unsupported trace file: {}'.format(path))
+        sources, codes = [], []
+        while True:
+            tag = f.read(1)
+            if not tag:
+                break
+            if tag == _SOURCE:
+                sources.append(_read_str(f))
+            elif tag == _CODE:
+                codes.append(_read_str(f))
+            elif tag == _EVENTS:
+                n, = struct.unpack('<Q', _read_exact(f, 8))
+                times, sids, cids = array('d'), array('I'), array('I')
+                for a in (times, sids, cids):
+                    a.frombytes(_read_exact(f, n * a.itemsize))
+                    if swap:
+                        a.byteswap()
+                for i in range(n):
+                    nargs, = struct.unpack('<H', _read_exact(f, 2))
+                    args = tuple(_read_str(f) for _ in range(nargs))
+                    yield (times[i], sources[sids[i]], codes[cids[i]], args)
+            else:
+                raise Exception('corrupt trace file: {}'.format(path))
+
+
+def _format_lines(events, formats):
+    for time, source, message, args in events:
+        if args:
+            message = message.format(*args)
+        yield formats % {'time': time, 'source': source, 'message': message}
+
+
+def trace_to_text(path, out=None, formats=_TEXT_FORMAT):
+    '''Writes a dumped trace in the text format used by get_think_logger.'''
+    out = out or sys.stdout
+    for line in _format_lines(read_trace(path), formats):
+        out.write(line + '\n')
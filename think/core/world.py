@@ -1,5 +1,10 @@
-import threading
+import concurrent.futures
+import functools
+import multiprocessing
+import os
+import random
 
+from .analysis import Data, Values
 from .clock import Clock
 from .process import Process
 
@@ -14,6 +19,120 @@ class Task(Process):
         self.events.append((self.time(), event))
         return self
 
+    def __getstate__(self):
+        # a task returned from a worker process keeps its events, but not
+        # its clock, which holds locks and threads
+        state = self.__dict__.copy()
+        state['clock'] = None
+        return state
+
+
+def _replicate(factory, seed, record=None):
+    random.seed(seed)
+    result = factory()
+    if record is not None:
+        record(seed, result)
+    return result
+
+
+def _recorder(store, factory, model=None, params=None):
+    # runs in the worker, so each replication is stored as it finishes
+    if store is None:
+        return None
+    if model is None:
+        model = getattr(factory, 'func', factory).__name__
+    return functools.partial(store.add_run, model, params)
+
+
+def _merge(results):
+    first = results[0]
+    if isinstance(first, Data):
+        merged = Data(len(first.values_list))
+        for data in results:
+            merged.extend(data)
+        return merged
+    elif isinstance(first, Values):
+        merged = Values()
+        for values in results:
+            merged.extend(values)
+        return merged
+    elif isinstance(first, (tuple, list)):
+        return type(first)(_merge([result[i] for result in results])
+                           for i in range(len(first)))
+    elif isinstance(first, dict):
+        return {key: _merge([result[key] for result in results])
+                for key in first}
+    else:
+        return list(results)
+
+
+def _cells(result):
+    if isinstance(result, Data):
+        yield from result.values_list
+    elif isinstance(result, Values):
+        yield result
+    elif isinstance(result, (tuple, list)):
+        for item in result:
+            yield from _cells(item)
+    elif isinstance(result, dict):
+        for item in result.values():
+            yield from _cells(item)
+
+
+def _precise(result, half_width):
+    for values in _cells(result):
+        if values.size() == 0:
+            continue
+        ci = values.ci()
+        if ci is None or ci > half_width:
+            return False
+    return True
+
+
+def _seeds(n, seed=None):
+    rng = random if seed is None else random.Random(seed)
+    return [rng.randrange(2 ** 32) for _ in range(n)]
+
+
+def _pool(workers=None):
+    context = multiprocessing.get_context('spawn')
+    return concurrent.futures.ProcessPoolExecutor(
+        workers or os.cpu_count() or 1, mp_context=context)
+
+
+def _run_jobs(jobs, workers=None, on_result=None, pool=None):
+    # jobs are (factory, seed) pairs, or (factory, seed, record) triples;
+    # factories must be importable (e.g. top-level functions or partials
+    # of them) to run in worker processes; callers running many batches
+    # can pass a pool from _pool to avoid starting one per batch
+    results = [None] * len(jobs)
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if pool is not None:
+        _submit_jobs(pool, jobs, results, on_result)
+    elif workers <= 1:
+        state = random.getstate()
+        try:
+            for i, job in enumerate(jobs):
+                results[i] = _replicate(*job)
+                if on_result is not None:
+                    on_result(i, results[i])
+        finally:
+            random.setstate(state)
+    else:
+        with _pool(workers) as pool:
+            _submit_jobs(pool, jobs, results, on_result)
+    return results
+
+
+def _submit_jobs(pool, jobs, results, on_result):
+    futures = {pool.submit(_replicate, *job): i
+               for i, job in enumerate(jobs)}
+    for future in concurrent.futures.as_completed(futures):
+        i = futures[future]
+        results[i] = future.result()
+        if on_result is not None:
+            on_result(i, results[i])
+
 
 class World:
 
@@ -23,7 +142,7 @@ class World:
         clock = clocks[0] if len(clocks) > 0 else Clock()
         for p in self.processes:
             p.clock = clock
-        clock.register(threading.current_thread())
+        clock.register(clock.current_thread())
 
     def run(self, time, output=None, real_time=None):
         if len(self.processes) > 0:
@@ -31,8 +150,53 @@ class World:
             if output is not None:
                 p0.clock.set_output(output)
             if real_time is not None:
-                p0.clock.real_time = real_time
+                p0.clock.set_real_time(real_time)
             for p in self.processes[1:]:
-                p0.run_thread(lambda: p.run(time=time))
+                p0.run_thread(lambda p=p: p.run(time=time))
             p0.run(time=time)
             p0.wait_for_all()
+
+    async def run_async(self, time, output=None, real_time=None):
+        if len(self.processes) > 0:
+            clock = self.processes[0].clock
+            if not hasattr(clock, 'run_async'):
+                raise Exception('run_async requires a GreenletClock')
+            await clock.run_async(lambda: self.run(time, output, real_time))
+
+    @staticmethod
+    def run_many(factory, n, workers=None, seed=None, store=None,
+                 model=None):
+        # each replication gets its own seed, drawn up front, so results
+        # do not depend on the number of workers; with a ResultStore, each
+        # replication is also saved under the model name and its seed
+        if n == 0:
+            return None
+        record = _recorder(store, factory, model)
+        jobs = [(factory, s, record) for s in _seeds(n, seed)]
+        return _merge(_run_jobs(jobs, workers))
+
+    @staticmethod
+    def run_until_precise(factory, half_width, min_n=4, max_n=1000,
+                          batch=None, workers=None, seed=None):
+        # runs batches of replications until every non-empty Values cell
+        # has a confidence interval within half_width, and returns the
+        # merged result with the number of replications run
+        rng = random if seed is None else random.Random(seed)
+        batch = batch or workers or os.cpu_count() or 1
+        results = []
+        # one pool of worker processes serves every batch
+        pool = None
+        if (workers or os.cpu_count() or 1) > 1:
+            pool = _pool(workers)
+        try:
+            while len(results) < max_n:
+                n = max(min_n - len(results), batch)
+                n = min(n, max_n - len(results))
+                jobs = [(factory, rng.randrange(2 ** 32)) for _ in range(n)]
+                results.extend(_run_jobs(jobs, workers, pool=pool))
+                if _precise(_merge(results), half_width):
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return (_merge(results), len(results)) if results else (None, 0)
@@ -70,8 +70,11 @@ class Audition(Module):
         return self
 
     def _try_listen(self, query):
+        if query is None:
+            return None
+        matches = query.compile()
         for (aural, obj) in self.aurals:
-            if query is not None and query.matches(aural):
+            if matches(aural):
                 return aural
         return None
 
@@ -85,7 +88,7 @@ class Audition(Module):
     def start_listen(self, query=None, heard=False, **kwargs):
         query = self._construct_query(query, heard, kwargs)
         self.listen_buffer.acquire()
-        self.think('listen {}'.format(query))
+        self.think('listen {}', query)
         match = self._try_listen(query)
         if match is not None:
             self._finish_listen(match)
@@ -104,7 +107,7 @@ class Audition(Module):
     def start_listen_for(self, query=None, heard=False, **kwargs):
         query = self._construct_query(query, heard, kwargs)
         self.listen_buffer.acquire()
-        self.think('wait for {}'.format(query))
+        self.think('wait for {}', query)
         aural = self._try_listen(query)
         if aural is not None:
             self._finish_listen(aural)
@@ -119,7 +122,8 @@ class Audition(Module):
             aural.set('heard', True)
             for fn in self.attend_fns:
                 fn(aural)
-        self.listen_buffer.set(aural, duration, 'found {}'.format(aural), fn)
+        self.listen_buffer.set(aural, duration, 'found {}', fn, (aural,),
+                               bool(self.attend_fns))
 
     def listen_for(self, query=None, heard=False, **kwargs):
         query = self._construct_query(query, heard, kwargs)
@@ -131,19 +135,21 @@ class Audition(Module):
             self.last_encode_cancel.try_cancel()
 
         def fn():
-            self.log('encoded "{}"'.format(obj))
+            self.log('encoded "{}"', obj)
             self.encode_buffer.set(obj)
             aural.set('heard', True)
             self.remove(aural)
             for fn in self.encode_fns:
                 fn(aural, object)
 
-        self.last_encode_cancel = self.run_thread_can_cancel(fn, duration)
+        run = (self.run_thread_can_cancel if self.encode_fns
+               else self.schedule_can_cancel)
+        self.last_encode_cancel = run(fn, duration)
 
     def start_encode(self, aural, suppress_think=False):
         self.encode_buffer.acquire()
         if not suppress_think:
-            self.think('encode {}'.format(aural))
+            self.think('encode {}', aural)
         obj = None
         for (a, o) in self.aurals:
             if a == aural:
@@ -49,21 +49,21 @@ class Eyes(Module):
                 self._compute_eccentricity(visual))
         new_loc = Location(visual.x + random.gauss(0, sd),
                            visual.y + random.gauss(0, sd))
-        self.log('prepare {}'.format(new_loc))
+        self.log('prepare {}', new_loc)
         duration = self._rand_time(self.prep_time)
 
         def fn():
             self.move(visual, new_loc, enc_start, enc_dur)
 
-        self.last_prep_cancel = self.run_thread_can_cancel(fn, duration)
+        self.last_prep_cancel = self.schedule_can_cancel(fn, duration)
 
     def move(self, visual, new_loc, enc_start, enc_dur):
-        self.log('move {}'.format(new_loc))
+        self.log('move {}', new_loc)
         duration = self._rand_time(
             self.exec_time_base) + self.exec_time_inc * self._compute_eccentricity(visual)
 
         def fn():
-            self.log('moved {}'.format(new_loc))
+            self.log('moved {}', new_loc)
             self.loc = new_loc
             if enc_start + enc_dur > self.time():
                 completed = (self.time() - enc_start) / enc_dur
@@ -75,4 +75,5 @@ class Eyes(Module):
             for fn in self.fixate_fns:
                 fn(self.loc)
 
-        self.run_thread(fn, duration)
+        run = self.run_thread if self.fixate_fns else self.schedule
+        run(fn, duration)
@@ -55,12 +55,12 @@ class Instruction(Module):
         if name not in self.goals:
             raise Exception
         goal = self.goals[name]
-        self.log('executing goal {}'.format(goal.name))
+        self.log('executing goal {}', goal.name)
         context = context or Chunk()
         previous = 'start'
         for action in goal.actions:
             self.memory.recall(goal=goal.name, previous=previous)
-            self.log('executing action {}'.format(action))
+            self.log('executing action {}', action)
             for executor in self.executors:
                 executed = executor(action, context)
                 if executed:
@@ -12,7 +12,7 @@ class Language(Module):
         return self
 
     def interpret(self, text):
-        self.log('interpreting "{}"'.format(text))
+        self.log('interpreting "{}"', text)
         words = text.split(' ')
         if len(words) == 2 and words[0] == 'to':
             return Item(isa='goal', name=words[1])
@@ -20,6 +20,6 @@ class Language(Module):
             for interpreter in self.interpreters:
                 sem = interpreter(words)
                 if sem:
-                    self.log('interpreted as {}'.format(sem))
+                    self.log('interpreted as {}', sem)
                     return sem
             return None
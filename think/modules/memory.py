@@ -1,12 +1,26 @@
+import bisect
 import math
 import random
 
 from think import Buffer, Item, Module, Query
 
 
+def _is_number(val):
+    return isinstance(val, (int, float)) and val == val
+
+
+def _content(chunk):
+    # chunks with equal slots have equal content keys; raises TypeError
+    # for chunks holding unhashable values
+    return frozenset(chunk.slots.items())
+
+
 class Chunk(Item):
+    __slots__ = ('id', 'creation_time', 'activation', 'transient_activation',
+                 'use_count', 'uses', 'memory')
 
     def __init__(self, **kwargs):
+        self.memory = None
         super().__init__(**kwargs)
         self.id = self.get('id') or self.get(
             'name') or self.get('isa') or 'chunk'
@@ -16,6 +30,39 @@ class Chunk(Item):
         self.use_count = 0
         self.uses = []
 
+    # a chunk in a memory keeps that memory's indexes up to date when its
+    # slots are changed through set and unset, or assigned as attributes
+    def __setattr__(self, name, val):
+        if (name not in _ATTRS and self.memory is not None
+                and name in self._layout):
+            self.set(name, val)
+        else:
+            super().__setattr__(name, val)
+
+    def set(self, slot, val):
+        if self.memory is None:
+            return super().set(slot, val)
+        self.memory._unindex(self, slot)
+        super().set(slot, val)
+        self.memory._index(self, slot)
+        return self
+
+    def unset(self, slot):
+        if self.memory is None:
+            return super().unset(slot)
+        self.memory._unindex(self, slot)
+        super().unset(slot)
+        self.memory._index(self, slot)
+        return self
+
+    def __getstate__(self):
+        # the memory holding a chunk is not part of its state
+        slots = {'_layout': self._layout, 'memory': None}
+        for name in ('_hidden',) + Chunk.__slots__[:-1]:
+            if hasattr(self, name):
+                slots[name] = getattr(self, name)
+        return self.__dict__, slots
+
     def increment_use(self):
         self.use_count += 1
 
@@ -26,6 +73,9 @@ class Chunk(Item):
         return '<{}>{}'.format(self.id, self.slots)
 
 
+_ATTRS = frozenset(Chunk.__slots__ + ('_layout', '_hidden'))
+
+
 class Memory(Module):
 
     NO_DECAY = 1
@@ -36,6 +86,7 @@ class Memory(Module):
         super().__init__('memory', agent)
         self.decay = decay or Memory.NO_DECAY
         self.chunks = {}
+        self._clear_indexes()
         self.buffer = Buffer('memory', self)
         self.decay_rate = 0.5
         self.retrieval_threshold = 0.0
@@ -55,8 +106,178 @@ class Memory(Module):
             chunk = Chunk(**kwargs)
         chunk.id = self._uniquify(chunk.id)
         self.chunks[chunk.id] = chunk
+        self._ranks[chunk.id] = len(self._ranks)
+        chunk.memory = self
+        self._index(chunk)
         return chunk
 
+    def _clear_indexes(self):
+        # slot -> value -> {chunk id: chunk}, with chunks whose value for a
+        # slot is unhashable kept apart in _unhashed[slot]; and content key
+        # -> {chunk id: chunk}, with chunks holding any unhashable value
+        # kept apart in _unhashed_contents
+        self._postings = {}
+        self._unhashed = {}
+        self._contents = {}
+        self._unhashed_contents = {}
+        self._sorted = {}
+        self._ranks = {}
+        self._reordered = False
+
+    def _index(self, chunk, slot=None):
+        if self.chunks.get(chunk.id) is not chunk:
+            return
+        for slot in chunk.get_slots() if slot is None else (slot,):
+            if not chunk.has(slot):
+                continue
+            val = chunk.get(slot)
+            try:
+                values = self._postings.setdefault(slot, {})
+                posting = values.get(val)
+                if posting is None:
+                    posting = values[val] = {}
+                    self._add_sorted(slot, val)
+                posting[chunk.id] = chunk
+            except TypeError:
+                self._unhashed.setdefault(slot, {})[chunk.id] = chunk
+        try:
+            self._contents.setdefault(_content(chunk), {})[chunk.id] = chunk
+        except TypeError:
+            self._unhashed_contents[chunk.id] = chunk
+
+    def _unindex(self, chunk, slot):
+        if self.chunks.get(chunk.id) is not chunk:
+            return
+        self._reordered = True
+        if chunk.has(slot):
+            try:
+                values = self._postings[slot]
+                posting = values[chunk.get(slot)]
+                posting.pop(chunk.id, None)
+                if not posting:
+                    del values[chunk.get(slot)]
+                    self._remove_sorted(slot, chunk.get(slot))
+            except TypeError:
+                self._unhashed[slot].pop(chunk.id, None)
+        try:
+            content = _content(chunk)
+            self._contents[content].pop(chunk.id, None)
+            if not self._contents[content]:
+                del self._contents[content]
+        except TypeError:
+            self._unhashed_contents.pop(chunk.id, None)
+
+    def _add_sorted(self, slot, val):
+        keys = self._sorted.get(slot)
+        if keys is None or keys is False:
+            # not built yet, or the slot has non-numeric values
+            return
+        if _is_number(val):
+            bisect.insort(keys, val)
+        else:
+            self._sorted[slot] = False
+
+    def _remove_sorted(self, slot, val):
+        keys = self._sorted.get(slot)
+        if keys is not None and keys is not False and _is_number(val):
+            del keys[bisect.bisect_left(keys, val)]
+        else:
+            self._sorted.pop(slot, None)
+
+    def _sorted_values(self, slot):
+        # the sorted distinct values of a slot, or False when some of them
+        # are not numbers; built on first use, then kept up to date
+        keys = self._sorted.get(slot)
+        if keys is None:
+            values = self._postings.get(slot, {})
+            keys = (sorted(values) if all(_is_number(val) for val in values)
+                    else False)
+            self._sorted[slot] = keys
+        return keys
+
+    def _ranges(self, query, limit):
+        # yields (size, postings) for each slot with range conditions,
+        # found by bisecting its sorted values; sizes are only counted up
+        # to the limit, since larger ranges will not be used
+        slots = {}
+        for slotq in query.slotqs:
+            if slotq.op in ('>', '>=', '<', '<=') and _is_number(slotq.val):
+                slots.setdefault(slotq.slot, []).append(slotq)
+        for slot, slotqs in slots.items():
+            keys = self._sorted_values(slot)
+            if keys is False:
+                continue
+            lo, hi = 0, len(keys)
+            for slotq in slotqs:
+                if slotq.op == '>':
+                    lo = max(lo, bisect.bisect_right(keys, slotq.val))
+                elif slotq.op == '>=':
+                    lo = max(lo, bisect.bisect_left(keys, slotq.val))
+                elif slotq.op == '<':
+                    hi = min(hi, bisect.bisect_left(keys, slotq.val))
+                else:
+                    hi = min(hi, bisect.bisect_right(keys, slotq.val))
+            values = self._postings.get(slot, {})
+            # chunks with unhashable values are not in the sorted values,
+            # so they are always candidates
+            unhashed = self._unhashed.get(slot)
+            postings = [unhashed] if unhashed else []
+            size = len(unhashed) if unhashed else 0
+            for val in keys[lo:hi]:
+                postings.append(values[val])
+                size += len(values[val])
+                if size >= limit:
+                    break
+            else:
+                yield size, postings
+
+    def _candidates(self, query):
+        # starts from the most selective index, either the chunks with an
+        # equality condition's value or those in a range of sorted values,
+        # and keeps the ones in every other equality posting; the query is
+        # still tested on them
+        postings = []
+        merged = False
+        for slotq in query.slotqs:
+            if slotq.op != '=' or slotq.val is None:
+                continue
+            try:
+                posting = self._postings.get(slotq.slot, {}).get(slotq.val)
+            except TypeError:
+                continue
+            # chunks with an unhashable value for the slot may still be
+            # equal to the query's value
+            unhashed = self._unhashed.get(slotq.slot)
+            if unhashed:
+                posting = dict(posting or {})
+                posting.update(unhashed)
+                merged = True
+            if not posting:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        limit = len(postings[0]) if postings else len(self.chunks)
+        best = None
+        for size, range_postings in self._ranges(query, limit):
+            if size < limit:
+                limit, best = size, range_postings
+        if best is not None:
+            candidates = [chunk for posting in best
+                          for id, chunk in posting.items()
+                          if all(id in other for other in postings)]
+            candidates.sort(key=lambda chunk: self._ranks[chunk.id])
+            return candidates
+        if not postings:
+            return self.chunks.values()
+        rest = postings[1:]
+        candidates = [chunk for id, chunk in postings[0].items()
+                      if all(id in posting for posting in rest)]
+        if self._reordered or merged:
+            # chunks re-indexed by set are out of order in their postings,
+            # as are those merged in from _unhashed
+            candidates.sort(key=lambda chunk: self._ranks[chunk.id])
+        return candidates
+
     def get(self, id):
         return self.chunks[id]
 
@@ -67,22 +288,27 @@ class Memory(Module):
             chunk.add_use(self.time())
 
     def _get_match(self, chunk):
-        for existing in self.chunks.values():
-            if existing.equals(chunk):
-                return existing
-        return None
+        try:
+            matches = list(self._contents.get(_content(chunk), {}).values())
+        except TypeError:
+            matches = [existing
+                       for existing in self._unhashed_contents.values()
+                       if existing.equals(chunk)]
+        if not matches:
+            return None
+        return min(matches, key=lambda existing: self._ranks[existing.id])
 
     def store(self, chunk=None, boost=None, **kwargs):
         if not chunk:
             chunk = Chunk(**kwargs)
-        self.think('store {}'.format(chunk))
+        self.think('store {}', chunk)
         match = self._get_match(chunk)
         if match is not None:
-            self.log('stored and merged into {}'.format(match))
+            self.log('stored and merged into {}', match)
             self._add_use(match)
             chunk = match
         else:
-            self.log('stored {}'.format(chunk))
+            self.log('stored {}', chunk)
             chunk.id = self._uniquify(chunk.id)
             chunk.creation_time = self.time()
             self._add_use(chunk)
@@ -90,7 +316,7 @@ class Memory(Module):
         if boost is not None:
             for _ in range(boost):
                 self._add_use(chunk)
-            self.log('boosted {} times'.format(boost))
+            self.log('boosted {} times', boost)
         self._compute_activation(chunk)
         return chunk
 
@@ -132,10 +358,7 @@ class Memory(Module):
         return self.latency_factor * math.exp(min(-chunk.activation, self.retrieval_threshold))
 
     def _get_chunk(self, query):
-        matches = []
-        for chunk in self.chunks.values():
-            if query.matches(chunk):
-                matches.append(chunk)
+        matches = query.filter(self._candidates(query))
         best_chunk = None
         best_act = self.retrieval_threshold
         for chunk in matches:
@@ -149,15 +372,15 @@ class Memory(Module):
         if not query or not isinstance(query, Query):
             query = Query(**kwargs)
         self.buffer.acquire()
-        self.think('recall {}'.format(query))
-        self.log('recalling {}'.format(query))
+        self.think('recall {}', query)
+        self.log('recalling {}', query)
         chunk = self._get_chunk(query)
         self._start_recall(chunk)
 
     def start_recall_by_id(self, id):
         self.buffer.acquire()
-        self.think('recall <{}>'.format(id))
-        self.log('recalling <{}>'.format(id))
+        self.think('recall <{}>', id)
+        self.log('recalling <{}>', id)
         chunk = self.get(id)
         act = self._compute_transient_act(chunk)
         self._start_recall(chunk if act >= self.retrieval_threshold else None)
@@ -166,8 +389,8 @@ class Memory(Module):
         if chunk is not None:
             duration = self.latency_factor * \
                 math.exp(-chunk.transient_activation)
-            self.buffer.set(chunk, duration, 'recalled {}'.format(
-                chunk), lambda: self._add_use(chunk))
+            self.buffer.set(chunk, duration, 'recalled {}',
+                            lambda: self._add_use(chunk), (chunk,))
         else:
             duration = self.latency_factor * \
                 math.exp(-self.retrieval_threshold)
@@ -190,4 +413,7 @@ class Memory(Module):
         self.recall_by_id(chunk.id)
 
     def clear(self):
+        for chunk in self.chunks.values():
+            chunk.memory = None
         self.chunks = {}
+        self._clear_indexes()
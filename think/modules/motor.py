@@ -70,19 +70,19 @@ class Motor(Module):
     def type(self, text):
         for burst in self.bursts(text):
             self.worker.acquire()
-            self.think('type "{}"'.format(burst))
-            self.log('typing "{}"'.format(burst))
+            self.think('type "{}"', burst)
+            self.log('typing "{}"', burst)
 
-            def fn():
+            def fn(burst=burst):
                 shifted = False
                 for key in self.keys(burst):
                     self.wait(self._key_time)
                     if key == 'shift':
                         shifted = not shifted
-                        self.log('{} "{}"'.format(
-                            'pressed' if shifted else 'released', key))
+                        self.log('{} "{}"',
+                                 'pressed' if shifted else 'released', key)
                     else:
-                        self.log('typed "{}"'.format(key))
+                        self.log('typed "{}"', key)
                     self.keyboard.type(key)
             self.worker.run(action=fn)
 
@@ -107,8 +107,8 @@ class Motor(Module):
 
     def start_move_to(self, visual):
         self.worker.acquire()
-        self.think('move mouse {}'.format(visual))
-        self.log('moving mouse {}'.format(visual))
+        self.think('move mouse {}', visual)
+        self.log('moving mouse {}', visual)
         self.vision.start_encode(visual)
         duration = self.calc_move_time(self.mouse_loc, visual)
 
@@ -117,7 +117,9 @@ class Motor(Module):
             self.mouse.move(visual)
             self.display.set_pointer(visual)
 
-        self.worker.run(duration, 'moved mouse {}'.format(visual), fn)
+        # mouse fns may wait, so they need a thread of their own
+        run = self.worker.run if self.mouse.move_fns else self.worker.schedule
+        run(duration, 'moved mouse {}', fn, args=(visual,))
 
     def move_to(self, visual):
         self.start_move_to(visual)
@@ -139,7 +141,9 @@ class Motor(Module):
                 self.mouse.click(self.mouse_loc)
                 self.display.set_click(self.mouse_loc)
 
-        self.worker.run(duration, 'clicked mouse {}'.format(self.mouse_loc), fn)
+        run = (self.worker.run if self.mouse.has_click_fns(self.mouse_loc)
+               else self.worker.schedule)
+        run(duration, 'clicked mouse {}', fn, args=(self.mouse_loc,))
 
     def click(self):
         self.start_click()
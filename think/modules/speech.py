@@ -23,14 +23,15 @@ class Speech(Module):
 
     def _say_word(self, word, s1, s2, s3):
         self.worker.acquire()
-        self.think(s1 + ' "' + word + '"')
-        self.log(s2 + ' "' + word + '"')
+        self.think('{} "{}"', s1, word)
+        self.log('{} "{}"', s2, word)
         duration = self.calculate_duration(word)
 
         def fn():
             for fn in self.say_fns:
                 fn(word)
-        self.worker.run(duration, s3 + ' "' + word + '"', fn)
+        run = self.worker.run if self.say_fns else self.worker.schedule
+        run(duration, '{} "{}"', fn, args=(s3, word))
 
     def say(self, text):
         for word in text_to_words(text):
@@ -41,6 +41,90 @@ class MemoryTest(unittest.TestCase):
         self.assertEqual('Whiskers~2', chunk.id)
         self.assertEqual(chunk, memory.get(chunk.id))
 
+    def test_index(self):
+        agent = Agent(output=False)
+        memory = Memory(agent)
+        for i in range(20):
+            memory.add(isa='number', value=i, parity=i % 2)
+        memory.add(isa='list', value=[1, 2])
+        query = Query(isa='number', parity=1).lt('value', 5)
+        self.assertEqual(2, len(memory._candidates(query)))
+        self.assertEqual([1, 3], [chunk.value for chunk
+                                  in query.filter(memory._candidates(query))])
+        self.assertEqual(1, memory.recall(query.lt('value', 2)).value)
+
+        chunk = memory.recall(isa='number', value=7)
+        chunk.set('parity', 0)
+        self.assertEqual(9, len(memory._candidates(Query(parity=1))))
+        # the chunk with an unhashable value is a candidate for any value
+        self.assertEqual([7, [1, 2]], [c.value for c in
+                                       memory._candidates(Query(value=7))])
+        candidates = memory._candidates(Query(isa='number', value=7,
+                                              parity=0))
+        self.assertEqual([chunk], candidates)
+        self.assertEqual(6, len(memory._candidates(Query().lt('value', 5))))
+        self.assertEqual(21, len(memory._candidates(Query(value=[1, 2]))))
+        self.assertEqual([], memory._candidates(Query(isa='letter')))
+
+        chunk.parity = 2
+        self.assertIs(chunk, memory.recall(parity=2))
+        self.assertEqual(10, len(memory._candidates(Query(parity=0))))
+        self.assertEqual(2, chunk.get('parity'))
+
+        memory.clear()
+        self.assertEqual([], memory._candidates(Query(isa='number')))
+        chunk.set('parity', 1)
+        chunk.parity = 1
+        self.assertEqual(1, chunk.get('parity'))
+
+    def test_range_index(self):
+        agent = Agent(output=False)
+        memory = Memory(agent)
+        for i in range(100):
+            memory.add(isa='count', i=i, next=i + 1)
+        memory.add(isa='count', i=50.5, next=51.5)
+        memory.add(isa='word', i='fifty')
+
+        # a slot with a value that is not a number has no range index
+        query = Query(isa='count').ge('i', 50).lt('i', 53)
+        self.assertEqual(101, len(memory._candidates(query)))
+        memory.get('word').unset('i')
+
+        self.assertEqual([50, 51, 52, 50.5],
+                         [c.i for c in memory._candidates(query)])
+        query.le('next', 52)
+        self.assertEqual([50, 51, 50.5], [
+            c.i for c in query.filter(memory._candidates(query))])
+        self.assertEqual(101, len(memory._candidates(Query().gt('i', -1))))
+
+        memory.add(isa='count', i=200)
+        memory.recall(isa='count', i=51).set('i', 300)
+        self.assertEqual([300, 200], [c.i for c in memory._candidates(
+            Query(isa='count').gt('i', 100))])
+        self.assertEqual([], memory._candidates(Query().gt('i', 300)))
+
+    def test_store_merge(self):
+        agent = Agent(output=False)
+        memory = Memory(agent)
+        first = memory.store(isa='pair', word='a', digit=1)
+        memory.add(isa='pair', word='a', digit=1)
+        self.assertIs(first, memory.store(isa='pair', word='a', digit=1))
+        self.assertEqual(2, len(memory.chunks))
+
+        first.set('digit', 2)
+        merged = memory.store(isa='pair', word='a', digit=1)
+        self.assertIsNot(first, merged)
+        self.assertIs(first, memory.store(isa='pair', digit=2, word='a'))
+        first.unset('digit')
+        self.assertIs(first, memory.store(isa='pair', word='a'))
+        first.word = 'b'
+        self.assertIs(first, memory.store(isa='pair', word='b'))
+        self.assertEqual(2, len(memory.chunks))
+
+        listed = memory.store(isa='list', items=[1, 2])
+        self.assertIs(listed, memory.store(isa='list', items=[1, 2]))
+        self.assertEqual(3, len(memory.chunks))
+
 
 class DecayTest(unittest.TestCase):
 
@@ -55,3 +55,25 @@ class MouseTest(unittest.TestCase):
             motor.point_and_click(visual)
         agent.wait_for_all()
         self.assertGreaterEqual(agent.time(), end)
+
+    def test_waiting_click_fn(self, output=False):
+        agent = Agent(output=output)
+        env = Environment()
+        vision = Vision(agent, env.display)
+        motor = Motor(agent, vision, env)
+        button = env.display.add_button(10, 10, 'X')
+        clicks = []
+
+        def fn(visual):
+            agent.wait(1.0)
+            clicks.append(agent.time())
+
+        env.mouse.add_click_fn(fn)
+
+        def click():
+            motor.move_to(button)
+            motor.click()
+        agent.run_thread(click)
+        agent.wait_for_all()
+        self.assertEqual(1, len(clicks))
+        self.assertAlmostEqual(clicks[0], agent.time(), 2)
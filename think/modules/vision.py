@@ -5,6 +5,7 @@ from think import Area, Buffer, Display, Location, Module, Query
 
 
 class Visual(Area):
+    __slots__ = ('freq',)
 
     def __init__(self, x, y, w, h, isa):
         super().__init__(x, y, w, h, isa)
@@ -53,20 +54,21 @@ class Vision(Module):
     def _try_find(self, query):
         match = None
         match_dist = 0
-        for visual in self.display.visuals:
-            if query is not None and query.matches(visual):
-                current = self.eyes.loc if self.eyes is not None else self.encode_loc
-                dist = current.distance_to(visual)
-                if match is None or dist < match_dist:
-                    match = visual
-                    match_dist = dist
+        if query is None:
+            return match
+        current = self.eyes.loc if self.eyes is not None else self.encode_loc
+        for visual in query.filter(self.display.visuals):
+            dist = current.distance_to(visual)
+            if match is None or dist < match_dist:
+                match = visual
+                match_dist = dist
         return match
 
     def start_find(self, query=None, **kwargs):
         if not query:
             query = Query(**kwargs)
         self.find_buffer.acquire()
-        self.think('find {}'.format(query))
+        self.think('find {}', query)
         match = self._try_find(query)
         duration = self.find_time
         if match is not None:
@@ -74,7 +76,8 @@ class Vision(Module):
                 self.display.set_attend(match)
                 for fn in self.attend_fns:
                     fn(match)
-            self.find_buffer.set(match, duration, 'found {}'.format(match), fn)
+            self.find_buffer.set(match, duration, 'found {}', fn, (match,),
+                                 bool(self.attend_fns))
         else:
             self.find_buffer.clear(duration, 'find failed')
 
@@ -91,15 +94,17 @@ class Vision(Module):
         if not query:
             query = Query(**kwargs)
         self.find_buffer.acquire()
-        self.think('wait for {}'.format(query))
+        self.think('wait for {}', query)
         visual = self._try_find(query.eq('seen', False))
         if visual is not None:
             self._finish_wait_for(visual)
         else:
             self.wait_for_query = query
+            self.display.add_waiter(self)
 
     def _finish_wait_for(self, visual):
         self.wait_for_query = None
+        self.display.remove_waiter(self)
         duration = self.find_time
 
         def fn():
@@ -107,7 +112,8 @@ class Vision(Module):
             for fn in self.attend_fns:
                 fn(visual)
 
-        self.find_buffer.set(visual, duration, 'found {}'.format(visual), fn)
+        self.find_buffer.set(visual, duration, 'found {}', fn, (visual,),
+                             bool(self.attend_fns))
 
     def wait_for(self, query=None, **kwargs):
         if not query:
@@ -120,19 +126,21 @@ class Vision(Module):
             self.last_encode_cancel.try_cancel()
 
         def fn():
-            self.log('encoded {}'.format(visual.obj))
+            self.log('encoded {}', visual.obj)
             self.encode_buffer.set(visual.obj)
             visual.set('seen', True)
             self.encode_loc = visual
             for fn in self.encode_fns:
                 fn(visual)
 
-        self.last_encode_cancel = self.run_thread_can_cancel(fn, duration)
+        run = (self.run_thread_can_cancel if self.encode_fns
+               else self.schedule_can_cancel)
+        self.last_encode_cancel = run(fn, duration)
 
     def start_encode(self, visual, suppress_think=False):
         self.encode_buffer.acquire()
         if not suppress_think:
-            self.think('encode {}'.format(visual))
+            self.think('encode {}', visual)
         duration = self.eyes.compute_enc_time(
             visual) if self.eyes is not None else self.default_enc_time
         if visual.obj is not None: